@@ -0,0 +1,197 @@
+"""
+Пропускная способность YaNews под ASGI: синхронные и асинхронные представления.
+
+Главная и страницы новостей запрашиваются из множества одновременных
+соединений напрямую через ASGIHandler, без сетевого сервера, чтобы
+сравнивать только работу приложения. Половина соединений анонимные,
+половина — с сессией пользователя. Каждый режим запускается в своём
+процессе с файловой базой в WAL.
+
+Локальный SQLite отвечает за микросекунды, и запрос ограничен GIL.
+--db-latency добавляет к каждому SQL-запросу задержку, как у сетевой
+базы: именно тогда важно, сколько запросов ждут базу одновременно.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import setup_django
+from sqlite_load import seed
+
+MODES = {
+    'sync': False,
+    'async': True,
+}
+
+
+def add_latency(seconds):
+    """Задерживает каждый SQL-запрос во всех соединениях."""
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.append(delay)
+
+    connection_created.connect(install, weak=False)
+
+
+def make_sessions(user_ids):
+    from django.conf import settings
+    from django.contrib.auth import (
+        BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+    )
+    from django.contrib.sessions.backends.db import SessionStore
+    cookies = []
+    for user in get_user_model().objects.filter(pk__in=user_ids):
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = (
+            'django.contrib.auth.backends.ModelBackend'
+        )
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        cookies.append(
+            f'{settings.SESSION_COOKIE_NAME}={session.session_key}'.encode()
+        )
+    return cookies
+
+
+async def request(application, path, cookie):
+    """Один GET-запрос; возвращает статус ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')] + (
+            [(b'cookie', cookie)] if cookie else []
+        ),
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def connection(application, paths, cookie, deadline, rng, results):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        status = await request(application, rng.choice(paths), cookie)
+        results.append((status, time.perf_counter() - start))
+
+
+async def load(application, paths, cookies, connections, seconds):
+    rng = random.Random(0)
+    results = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(
+        connection(
+            application, paths, cookies[index % len(cookies)] if index % 2
+            else None, deadline, random.Random(rng.random()), results,
+        )
+        for index in range(connections)
+    ))
+    return results
+
+
+def run(mode, connections, seconds, db_latency):
+    directory = tempfile.TemporaryDirectory()
+    setup_django(
+        'ya_news',
+        DEBUG=False,
+        NEWS_ASYNC_VIEWS=MODES[mode],
+        DATABASES={'default': {
+            'ENGINE': 'yacommon.sqlite',
+            'NAME': Path(directory.name) / 'load.sqlite3',
+            'CONN_MAX_AGE': 60,
+        }},
+    )
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.management import call_command
+    from django.db import connection as db_connection
+    from django.urls import reverse
+    call_command('migrate', verbosity=0)
+    news_ids, user_ids = seed(1000, 20_000, random.Random(0))
+    cookies = make_sessions(user_ids)
+    db_connection.close()
+    if db_latency:
+        add_latency(db_latency / 1000)
+    paths = [reverse('news:home')] + [
+        reverse('news:detail', args=(pk,)) for pk in news_ids[:100]
+    ]
+    application = ASGIHandler()
+    # Прогрев: кеши страниц, шаблоны и соединения потоков.
+    asyncio.run(load(application, paths, cookies, connections, 1))
+    results = asyncio.run(
+        load(application, paths, cookies, connections, seconds)
+    )
+    directory.cleanup()
+    timings = sorted(elapsed for status, elapsed in results)
+    quantiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'requests_per_s': round(len(timings) / seconds, 1),
+        'p50_ms': round(quantiles[49] * 1e3, 1),
+        'p95_ms': round(quantiles[94] * 1e3, 1),
+        'p99_ms': round(quantiles[98] * 1e3, 1),
+        'errors': sum(status != 200 for status, _ in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--mode', choices=sorted(MODES))
+    parser.add_argument('--connections', type=int, default=300)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument(
+        '--db-latency', type=float, default=0,
+        help='задержка каждого SQL-запроса, мс',
+    )
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(run(
+            args.mode, args.connections, args.seconds, args.db_latency
+        )))
+        return
+    print(f'Соединений: {args.connections}, {args.seconds:g} с на режим, '
+          f'задержка базы {args.db_latency:g} мс')
+    for mode in MODES:
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--mode', mode] + sys.argv[1:]
+        )
+        report = json.loads(output.splitlines()[-1])
+        print(f'{mode:<6} {report["requests_per_s"]:>8.1f} запр/с, '
+              f'p50 {report["p50_ms"]} мс, p95 {report["p95_ms"]} мс, '
+              f'p99 {report["p99_ms"]} мс, ошибок {report["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
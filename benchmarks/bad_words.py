@@ -0,0 +1,63 @@
+import argparse
+import random
+import timeit
+
+from common import setup_django
+
+setup_django('ya_news')
+
+from news.matching import AhoCorasick  # noqa: E402
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+TEXT = (
+    'Отличная новость, спасибо автору! Жду продолжения и подробностей, '
+    'а комментаторам напоминаю о правилах сообщества. '
+) * 8
+
+
+def make_words(count, rng):
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(5, 12)))
+        for _ in range(count)
+    ]
+
+
+def naive_search(words, text):
+    for word in words:
+        if word in text:
+            return word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Сравнение фильтра запрещённых слов на разных словарях.'
+    )
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+',
+        default=(10, 100, 1_000, 10_000, 50_000),
+    )
+    args = parser.parse_args()
+    rng = random.Random(0)
+    text = TEXT.lower()
+    print(f'Длина текста: {len(text)} символов, повторов: {args.repeat}')
+    print(f'{"слов":>8} {"построение, мс":>16} {"подстроки, мкс":>16} '
+          f'{"автомат, мкс":>14}')
+    for size in args.sizes:
+        words = make_words(size, rng)
+        build = timeit.timeit(lambda: AhoCorasick(words), number=1)
+        matcher = AhoCorasick(words)
+        naive = timeit.timeit(
+            lambda: naive_search(words, text), number=args.repeat
+        )
+        compiled = timeit.timeit(
+            lambda: matcher.search(text), number=args.repeat
+        )
+        print(f'{size:>8} {build * 1e3:>16.1f} '
+              f'{naive / args.repeat * 1e6:>16.1f} '
+              f'{compiled / args.repeat * 1e6:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+SETTINGS_MODULES = {
+    'ya_news': 'yanews.settings',
+    'ya_note': 'yanote.settings',
+}
+
+
+def setup_django(project, **overrides):
+    """
+    Подключает проект и инициализирует Django для замеров.
+
+    Именованные аргументы заменяют настройки проекта до django.setup().
+    """
+    sys.path.insert(0, str(ROOT_DIR / project))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS_MODULES[project])
+    import django
+    from django.conf import settings
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    django.setup()
+
+
+class TestDatabase:
+    """Временная тестовая база проекта на время замеров."""
+
+    def __enter__(self):
+        from django.db import connection
+        self.connection = connection
+        self.old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        return connection
+
+    def __exit__(self, *exc_info):
+        self.connection.creation.destroy_test_db(self.old_name, verbosity=0)
@@ -0,0 +1,109 @@
+"""
+Загрузка большой фикстуры новостей: loaddata против потокового загрузчика.
+
+Скрипт пишет синтетическую фикстуру в формате dumpdata (1% новостей,
+остальное комментарии) и загружает её в чистую базу каждым способом
+в отдельном процессе: `loaddata`, `load_news_fixture` и он же без
+откладывания индексов. Для каждого способа печатаются время и пиковый
+объём памяти процесса.
+"""
+import argparse
+import io
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from common import setup_django
+
+MODES = {
+    'loaddata': ('loaddata',),
+    'stream': ('load_news_fixture',),
+    'stream-indexes': ('load_news_fixture', '--no-defer-indexes'),
+}
+USERS = 100
+
+
+def write_fixture(path, rows, seed=0):
+    rng = random.Random(seed)
+    news = max(rows // 100, 1)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with open(path, 'w', encoding='utf-8') as fixture:
+        fixture.write('[\n')
+        for pk in range(1, rows + 1):
+            if pk <= news:
+                record = {'model': 'news.news', 'pk': pk, 'fields': {
+                    'title': f'Новость {pk}',
+                    'text': f'Текст новости {pk} о погоде и спорте.',
+                    'date': str(date(2024, 1, 1) - timedelta(days=pk // 10)),
+                }}
+            else:
+                record = {'model': 'news.comment', 'pk': pk - news, 'fields': {
+                    'news': rng.randint(1, news),
+                    'author': rng.randint(1, USERS),
+                    'text': f'Комментарий {pk}',
+                    'created': (
+                        start + timedelta(seconds=pk)
+                    ).isoformat().replace('+00:00', 'Z'),
+                }}
+            fixture.write(json.dumps(record, ensure_ascii=False))
+            fixture.write(',\n' if pk < rows else '\n')
+        fixture.write(']\n')
+
+
+def run(mode, path):
+    directory = tempfile.TemporaryDirectory()
+    setup_django('ya_news', DEBUG=False, DATABASES={'default': {
+        'ENGINE': 'yacommon.sqlite',
+        'NAME': Path(directory.name) / 'load.sqlite3',
+    }})
+    from django.core.management import call_command
+    from django.utils import timezone as django_timezone
+    from yacommon.seeding import seed_users
+    call_command('migrate', verbosity=0)
+    seed_users(USERS, django_timezone.now())
+    start = time.perf_counter()
+    call_command(*MODES[mode], path, verbosity=0, stdout=io.StringIO())
+    elapsed = time.perf_counter() - start
+    directory.cleanup()
+    return {
+        'seconds': round(elapsed, 1),
+        'peak_rss_mib': resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument(
+        '--modes', nargs='+', choices=list(MODES), default=list(MODES)
+    )
+    parser.add_argument('--mode', choices=list(MODES))
+    parser.add_argument('--fixture')
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(run(args.mode, args.fixture)))
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'news.json')
+        write_fixture(path, args.rows)
+        size = Path(path).stat().st_size / 2 ** 20
+        print(f'Записей: {args.rows}, файл {size:.0f} МиБ')
+        for mode in args.modes:
+            output = subprocess.check_output([
+                sys.executable, __file__, '--mode', mode, '--fixture', path,
+            ])
+            report = json.loads(output.splitlines()[-1])
+            print(f'{mode:<15} {report["seconds"]:>7.1f} с, '
+                  f'пик памяти {report["peak_rss_mib"]} МиБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Список заметок пользователя со 100 000 заметок.
+
+Сравниваются прежний список всех заметок со всеми полями, те же
+заметки потоком с выборкой только заголовка и адреса (HTML и JSON)
+и одна страница списка по курсору. У каждой заметки длинный текст,
+который списку не нужен. Печатаются медиана времени ответа и пиковая
+память по tracemalloc.
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from common import TestDatabase, setup_django
+
+
+def consume(response):
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    else:
+        response.render()
+
+
+def measure(view, request, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        consume(view(request))
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        consume(view(request))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--notes', type=int, default=100_000)
+    parser.add_argument(
+        '--text-size', type=int, default=2_000,
+        help='длина текста каждой заметки в символах'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django('ya_note')
+    from django.contrib.auth import get_user_model
+    from django.db.models import Value
+    from django.db.models.functions import Repeat
+    from django.test import RequestFactory
+    from notes.models import Note
+    from notes.seeding import seed_notes
+    from notes.views import NotesList
+
+    class FullNotesList(NotesList):
+        """Прежний список: все заметки сразу и со всеми полями."""
+
+        def get_queryset(self):
+            return Note.objects.filter(
+                author=self.request.user
+            ).order_by('id')
+
+        def get_context_data(self, **kwargs):
+            return super(NotesList, self).get_context_data(**kwargs)
+
+    with TestDatabase():
+        seeded = seed_notes(args.notes, 1, seed=1)
+        Note.objects.update(
+            text=Repeat(Value('x'), args.text_size)
+        )
+        user = get_user_model().objects.get(pk=seeded.users[0])
+        print(f'Заметок: {args.notes}, текст {args.text_size} символов')
+        for name, view, query in (
+            ('все поля', FullNotesList, {}),
+            ('поток HTML', NotesList, {'stream': 'html'}),
+            ('поток JSON', NotesList, {'stream': 'json'}),
+            ('страница', NotesList, {}),
+        ):
+            request = RequestFactory().get('/notes/', query)
+            request.user = user
+            seconds, peak = measure(view.as_view(), request, args.repeat)
+            print(f'{name:<12}{seconds * 1e3:>9.0f} мс'
+                  f'{peak / 2 ** 20:>9.1f} МиБ')
+
+
+if __name__ == '__main__':
+    main()
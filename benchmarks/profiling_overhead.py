@@ -0,0 +1,68 @@
+"""
+Накладные расходы профилирования запросов на страницах YaNews.
+
+Главная и страница новости с 500 комментариями запрашиваются
+авторизованным пользователем без профилирования, с замером 5% запросов
+и с замером каждого запроса. Режимы чередуются по кругу, чтобы дрейф
+машины сказывался на всех одинаково. Печатается медиана времени ответа
+и прирост относительно замера без профилирования.
+"""
+import argparse
+import statistics
+import time
+
+from common import TestDatabase, setup_django
+
+RATES = {'выключено': 0, '5%': 0.05, 'все': 1}
+
+
+def measure(clients, url, repeat):
+    from django.conf import settings
+    timings = {mode: [] for mode in clients}
+    for _ in range(repeat):
+        for mode, client in clients.items():
+            settings.PROFILING_SAMPLE_RATE = RATES[mode]
+            start = time.perf_counter()
+            client.get(url)
+            timings[mode].append(time.perf_counter() - start)
+    return {
+        mode: statistics.median(values) for mode, values in timings.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django('ya_news', DEBUG=False)
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+    from news.seeding import seed_news
+
+    with TestDatabase():
+        seeded = seed_news(20, 500, 10, seed=1)
+        user = get_user_model().objects.get(pk=seeded.users[0])
+        urls = {
+            'главная': reverse('news:home'),
+            'новость': reverse('news:detail', args=(seeded.news[0],)),
+        }
+        clients = {}
+        for mode, rate in RATES.items():
+            # Middleware подключается при первом запросе клиента.
+            settings.PROFILING_SAMPLE_RATE = rate
+            clients[mode] = Client()
+            clients[mode].force_login(user)
+            clients[mode].get(urls['главная'])
+        for page, url in urls.items():
+            report = measure(clients, url, args.repeat)
+            baseline = report['выключено']
+            for mode, seconds in report.items():
+                print(f'{page:<9}{mode:<11}{seconds * 1e3:>8.2f} мс'
+                      f'{(seconds / baseline - 1) * 100:>+8.1f}%')
+
+
+if __name__ == '__main__':
+    main()
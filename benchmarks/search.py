@@ -0,0 +1,86 @@
+import argparse
+import random
+import statistics
+import time
+
+from common import TestDatabase, setup_django
+
+setup_django('ya_note')
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db.models import Q  # noqa: E402
+
+from notes.models import Note  # noqa: E402
+from yacommon.search import search  # noqa: E402
+
+SYLLABLES = ('ка', 'ло', 'ми', 'ра', 'ст', 'но', 'ве', 'ту', 'пре', 'дом')
+PAGE_SIZE = 20
+
+
+def make_vocabulary(size, rng):
+    return list({
+        ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        for _ in range(size * 2)
+    })[:size]
+
+
+def seed(count, vocabulary, rng, batch_size=5000):
+    author = get_user_model().objects.create(username='benchmark')
+    for start in range(0, count, batch_size):
+        Note.objects.bulk_create(
+            Note(
+                title=' '.join(rng.choices(vocabulary, k=4)),
+                text=' '.join(rng.choices(vocabulary, k=rng.randint(30, 80))),
+                slug=f'note-{index}',
+                author=author,
+            )
+            for index in range(start, min(start + batch_size, count))
+        )
+    return author
+
+
+def icontains(queryset, query):
+    condition = Q()
+    for word in query.split():
+        condition &= Q(title__icontains=word) | Q(text__icontains=word)
+    return queryset.filter(condition)
+
+
+def measure(find, queryset, queries):
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        results = find(queryset, query)
+        results.count()
+        list(results[:PAGE_SIZE])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Поиск по заметкам: FTS5 против icontains.'
+    )
+    parser.add_argument('--notes', type=int, default=100_000)
+    parser.add_argument('--queries', type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    vocabulary = make_vocabulary(5000, rng)
+    queries = [
+        ' '.join(rng.choices(vocabulary, k=rng.randint(1, 2)))
+        for _ in range(args.queries)
+    ]
+    with TestDatabase():
+        start = time.perf_counter()
+        author = seed(args.notes, vocabulary, rng)
+        print(f'Заметок: {args.notes}, заполнение: '
+              f'{time.perf_counter() - start:.1f} с')
+        queryset = Note.objects.filter(author=author)
+        for name, find in (('FTS5', search), ('icontains', icontains)):
+            median, worst = measure(find, queryset, queries)
+            print(f'{name:<10} медиана {median * 1e3:8.1f} мс, '
+                  f'максимум {worst * 1e3:8.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import random
+import timeit
+
+from common import setup_django
+
+setup_django('ya_note')
+
+from pytils.translit import slugify  # noqa: E402
+
+from notes.slugs import cached_slugify, slug_cache_stats  # noqa: E402
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'идеи', 'для', 'проекта', 'встреча',
+    'с', 'командой', 'планы', 'на', 'неделю', 'отпуск', 'рецепт', 'борща',
+    'книги', 'прочитать', 'фильмы', 'посмотреть', 'черновик', 'статьи',
+    'отчёт', 'за', 'квартал', 'важное', 'напоминание', 'дела', 'дом',
+)
+
+
+def make_titles(count, unique, rng):
+    """Корпус заголовков, в котором часть заголовков повторяется."""
+    pool = [
+        ' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize()
+        for _ in range(unique)
+    ]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Холодная и тёплая транслитерация заголовков заметок.'
+    )
+    parser.add_argument('--titles', type=int, default=50_000)
+    parser.add_argument('--unique', type=int, default=2_000)
+    args = parser.parse_args()
+    titles = make_titles(args.titles, args.unique, random.Random(0))
+
+    def run(function):
+        for title in titles:
+            function(title)
+
+    plain = timeit.timeit(lambda: run(slugify), number=1)
+    cached_slugify.cache_clear()
+    cold = timeit.timeit(lambda: run(cached_slugify), number=1)
+    cold_stats = slug_cache_stats()
+    warm = timeit.timeit(lambda: run(cached_slugify), number=1)
+    print(f'Заголовков: {len(titles)}, уникальных: {args.unique}')
+    for name, seconds in (
+        ('pytils.slugify', plain),
+        ('кеш, холодный', cold),
+        ('кеш, тёплый', warm),
+    ):
+        print(f'{name:<16} {len(titles) / seconds:>12.0f} заголовков/с')
+    print(f'Доля попаданий в холодном проходе: {cold_stats["hit_rate"]:.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Пропускная способность SQLite при одновременных чтениях и записях.
+
+Сравниваются стандартный бэкенд без настроек и соединение на каждый
+запрос (`plain`) и бэкенд yacommon.sqlite с WAL, прагмами и постоянными
+соединениями (`tuned`). Каждый режим запускается в своём процессе.
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import setup_django
+
+MODES = {
+    'plain': {'ENGINE': 'django.db.backends.sqlite3', 'CONN_MAX_AGE': 0},
+    'tuned': {'ENGINE': 'yacommon.sqlite', 'CONN_MAX_AGE': 60},
+}
+
+
+def seed(news_count, comments_count, rng):
+    from django.contrib.auth import get_user_model
+    from news.models import Comment, News
+    User = get_user_model()
+    User.objects.bulk_create(User(username=f'user{i}') for i in range(50))
+    News.objects.bulk_create(
+        News(title=f'Новость {i}', text='Текст') for i in range(news_count)
+    )
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        Comment(
+            news_id=rng.choice(news_ids),
+            author_id=rng.choice(user_ids),
+            text=f'Комментарий {i}',
+        )
+        for i in range(comments_count)
+    )
+    News.objects.recount_comments()
+    return news_ids, user_ids
+
+
+def read(news_ids, user_ids, rng):
+    from news.models import Comment, News
+    news = News.objects.get(pk=rng.choice(news_ids))
+    list(Comment.objects.filter(news=news).select_related('author')[:50])
+
+
+def write(news_ids, user_ids, rng):
+    from django.db import transaction
+    from django.db.models import F
+    from news.models import Comment, News
+    news_id = rng.choice(news_ids)
+    with transaction.atomic():
+        Comment.objects.create(
+            news_id=news_id, author_id=rng.choice(user_ids), text='Новый'
+        )
+        News.objects.filter(pk=news_id).update(
+            comments_count=F('comments_count') + 1
+        )
+
+
+def worker(operation, data, seconds, seed_value, results):
+    from django.db import OperationalError, close_old_connections, connection
+    rng = random.Random(seed_value)
+    timings, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                operation(*data, rng)
+                timings.append(time.perf_counter() - start)
+            except OperationalError:
+                errors += 1
+            # Как в конце запроса: при CONN_MAX_AGE=0 соединение закрывается.
+            close_old_connections()
+    finally:
+        connection.close()
+    results.append((operation.__name__, timings, errors))
+
+
+def run(mode, readers, writers, seconds):
+    directory = tempfile.TemporaryDirectory()
+    setup_django('ya_news', DATABASES={'default': {
+        **MODES[mode], 'NAME': Path(directory.name) / 'load.sqlite3',
+    }})
+    from django.core.management import call_command
+    from django.db import connection
+    call_command('migrate', verbosity=0)
+    data = seed(1000, 20_000, random.Random(0))
+    connection.close()
+    results = []
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(operation, data, seconds, index, results),
+        )
+        for index, operation in enumerate(
+            [read] * readers + [write] * writers
+        )
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    directory.cleanup()
+    report = {}
+    for name in ('read', 'write'):
+        timings = [t for op, ts, _ in results if op == name for t in ts]
+        report[name] = {
+            'ops_per_s': round(len(timings) / seconds, 1),
+            'p95_ms': round(statistics.quantiles(
+                timings, n=20, method='inclusive'
+            )[-1] * 1e3, 2) if len(timings) > 1 else None,
+            'errors': sum(e for op, _, e in results if op == name),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--mode', choices=sorted(MODES))
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    if args.mode:
+        print(json.dumps(
+            run(args.mode, args.readers, args.writers, args.seconds)
+        ))
+        return
+    print(f'Потоков чтения: {args.readers}, записи: {args.writers}, '
+          f'{args.seconds:g} с на режим')
+    for mode in MODES:
+        output = subprocess.check_output(
+            [sys.executable, __file__, '--mode', mode] + sys.argv[1:]
+        )
+        report = json.loads(output.splitlines()[-1])
+        for name, stats in report.items():
+            print(f'{mode:<6} {name:<6} {stats["ops_per_s"]:>9.1f} оп/с, '
+                  f'p95 {stats["p95_ms"]} мс, ошибок {stats["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
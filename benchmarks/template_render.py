@@ -0,0 +1,83 @@
+"""
+Рендеринг страницы новости с 5000 комментариями на одной странице.
+
+Замеряется GET страницы для автора части комментариев и для читателя:
+с прогретым кешем блока комментариев (работает только шаблон страницы)
+и с холодным, когда заново рендерится каждый комментарий. Каждый набор
+настроек шаблонов запускается в отдельном процессе: загрузчики
+выбираются по DEBUG при импорте настроек.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import TestDatabase, setup_django
+
+COMMENTS = 5_000
+USERS = 20
+MODES = {'cached': '0', 'debug': '1'}
+
+
+def measure(client, url, repeat, cold):
+    from django.core.cache import cache
+    client.get(url)
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    return round(statistics.median(timings) * 1e3, 1)
+
+
+def run(repeat):
+    setup_django('ya_news', COMMENTS_COUNT_ON_DETAIL_PAGE=COMMENTS)
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+    from news.seeding import seed_news
+    setup_test_environment()
+    with TestDatabase():
+        seeded = seed_news(1, COMMENTS, USERS, seed=1)
+        url = reverse('news:detail', args=(seeded.news[0],))
+        report = {}
+        for role, pk in (('author', seeded.users[0]), ('reader', None)):
+            client = Client()
+            user = get_user_model().objects.create(
+                username=f'reader-{role}'
+            ) if pk is None else get_user_model().objects.get(pk=pk)
+            client.force_login(user)
+            for cold in (False, True):
+                key = f'{role} {"холодный" if cold else "прогретый"} кеш'
+                report[key] = measure(client, url, repeat, cold)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--mode', choices=list(MODES))
+    args = parser.parse_args()
+    if args.mode:
+        os.environ['YANEWS_DEBUG'] = MODES[args.mode]
+        print(json.dumps(run(args.repeat), ensure_ascii=False))
+        return
+    for mode in MODES:
+        output = subprocess.check_output([
+            sys.executable, __file__, '--mode', mode,
+            '--repeat', str(args.repeat),
+        ])
+        report = json.loads(output.splitlines()[-1])
+        for key, p50 in report.items():
+            print(f'{mode:<8}{key:<28}{p50:>9.1f} мс')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+"""
+Число запросов, задержка и пиковая память для каждого URL проектов.
+
+Без `--project` скрипт по очереди запускает себя для обоих проектов:
+настройки Django в одном процессе переключить нельзя. Отчёт каждого
+проекта записывается в JSON и сравнивается с сохранённым эталоном.
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import date, timedelta
+
+from common import ROOT_DIR, SETTINGS_MODULES, TestDatabase, setup_django
+
+BENCHMARKS_DIR = ROOT_DIR / 'benchmarks'
+REPORTS_DIR = BENCHMARKS_DIR / 'reports'
+BASELINES_DIR = BENCHMARKS_DIR / 'baselines'
+URL_MODULES = {'ya_news': 'news.urls', 'ya_note': 'notes.urls'}
+VOLUMES = {
+    'ya_news': {'users': 1_000, 'news': 10_000, 'comments': 1_000_000},
+    'ya_note': {'users': 1_000, 'notes': 100_000},
+}
+BATCH_SIZE = 5_000
+# Рост медианы меньше этого порога считаем шумом даже при большой доле.
+MIN_LATENCY_DELTA_MS = 2.0
+
+Case = namedtuple(
+    'Case', ('name', 'method', 'user', 'url', 'data', 'content_type'),
+    defaults=(None, None),
+)
+
+
+def batches(objects, size=BATCH_SIZE):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def create_users(count):
+    from django.contrib.auth import get_user_model
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f'user{index}') for index in range(count)
+    )
+    return list(User.objects.order_by('pk'))
+
+
+def make_client(user):
+    from django.test import Client
+    client = Client()
+    if user is not None:
+        client.force_login(user)
+    return client
+
+
+def seed_news(volumes, rng):
+    from news.models import Comment, News
+    users = create_users(volumes['users'])
+    today = date.today()
+    for batch in batches(
+        News(
+            title=f'Новость {index}',
+            text=f'Текст новости {index} о погоде, спорте и политике.',
+            date=today - timedelta(days=index // 10),
+        )
+        for index in range(volumes['news'])
+    ):
+        News.objects.bulk_create(batch)
+    news_ids = list(News.objects.values_list('pk', flat=True))
+    for batch in batches(
+        Comment(
+            news_id=rng.choice(news_ids),
+            author=rng.choice(users),
+            text=f'Комментарий {index}',
+        )
+        for index in range(volumes['comments'])
+    ):
+        Comment.objects.bulk_create(batch)
+    News.objects.recount_comments()
+    return users
+
+
+def news_cases(volumes, repeat):
+    from django.urls import reverse
+    from news.models import Comment, News
+
+    rng = random.Random(1)
+    users = seed_news(volumes, rng)
+    author, reader = users[0], users[1]
+    # Чтение и запись идут в разные новости: запись сбрасывает кеш
+    # комментариев и исказила бы замеры чтения.
+    read_news, write_news = News.objects.order_by('pk')[:2]
+    comment = Comment.objects.create(
+        news=write_news, author=author, text='Комментарий автора'
+    )
+    Comment.objects.bulk_create(
+        Comment(news=write_news, author=author, text='На удаление')
+        for _ in range(repeat + 2)
+    )
+    # SQLite не возвращает первичные ключи из bulk_create.
+    doomed = list(Comment.objects.filter(
+        news=write_news, text='На удаление'
+    ).values_list('pk', flat=True))
+    News.objects.filter(pk=write_news.pk).recount_comments()
+    detail = reverse('news:detail', args=(read_news.pk,))
+    edit = reverse('news:edit', args=(comment.pk,))
+    return [
+        Case('news:home', 'get', None, reverse('news:home')),
+        Case('news:archive', 'get', None, reverse('news:archive')),
+        Case('news:search', 'get', None, reverse('news:search'),
+             {'q': 'погод'}),
+        Case('news:detail', 'get', None, detail),
+        Case('news:detail', 'get', reader, detail),
+        Case('news:detail', 'post', reader,
+             reverse('news:detail', args=(write_news.pk,)),
+             {'text': 'Новый комментарий'}),
+        Case('news:edit', 'get', author, edit),
+        Case('news:edit', 'post', author, edit,
+             {'text': 'Изменённый комментарий'}),
+        Case('news:delete', 'get', author,
+             reverse('news:delete', args=(comment.pk,))),
+        Case('news:delete', 'post', author,
+             lambda index: reverse('news:delete', args=(doomed[index],))),
+        Case('news:comments_cache_metrics', 'get', None,
+             reverse('news:comments_cache_metrics')),
+    ]
+
+
+def seed_notes(volumes, rng):
+    from notes.models import Note
+    users = create_users(volumes['users'])
+    for batch in batches(
+        Note(
+            title=f'Заметка {index}',
+            text=f'Список покупок и планы на неделю, пункт {index}.',
+            slug=f'note-{index}',
+            author=rng.choice(users),
+        )
+        for index in range(volumes['notes'])
+    ):
+        Note.objects.bulk_create(batch)
+    return users
+
+
+def notes_cases(volumes, repeat):
+    from django.urls import reverse
+    from notes.models import Note
+
+    rng = random.Random(1)
+    users = seed_notes(volumes, rng)
+    author = users[0]
+    note = Note.objects.filter(author=author).first()
+    doomed = Note.objects.bulk_create(
+        Note(title='На удаление', text='Текст', slug=f'doomed-{index}',
+             author=author)
+        for index in range(repeat + 2)
+    )
+    lines = ''.join(
+        json.dumps({'title': f'Импорт {index}', 'text': 'Текст'}) + '\n'
+        for index in range(10)
+    )
+    form = {'title': note.title, 'text': 'Новый текст', 'slug': note.slug}
+    return [
+        Case('notes:home', 'get', None, reverse('notes:home')),
+        Case('notes:add', 'get', author, reverse('notes:add')),
+        Case('notes:add', 'post', author, reverse('notes:add'),
+             {'title': 'Новая заметка', 'text': 'Текст', 'slug': ''}),
+        Case('notes:edit', 'get', author,
+             reverse('notes:edit', args=(note.slug,))),
+        Case('notes:edit', 'post', author,
+             reverse('notes:edit', args=(note.slug,)), form),
+        Case('notes:detail', 'get', author,
+             reverse('notes:detail', args=(note.slug,))),
+        Case('notes:delete', 'get', author,
+             reverse('notes:delete', args=(note.slug,))),
+        Case('notes:delete', 'post', author,
+             lambda index: reverse(
+                 'notes:delete', args=(doomed[index].slug,)
+             )),
+        Case('notes:list', 'get', author, reverse('notes:list')),
+        Case('notes:search', 'get', author, reverse('notes:search'),
+             {'q': 'покупок'}),
+        Case('notes:success', 'get', author, reverse('notes:success')),
+        Case('notes:export', 'get', author, reverse('notes:export')),
+        Case('notes:import', 'post', author, reverse('notes:import'),
+             lines, 'application/x-ndjson'),
+    ]
+
+
+CASES = {'ya_news': news_cases, 'ya_note': notes_cases}
+
+
+def send(client, case, index):
+    url = case.url(index) if callable(case.url) else case.url
+    kwargs = {}
+    if case.content_type:
+        kwargs['content_type'] = case.content_type
+    response = getattr(client, case.method)(url, case.data, **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f'{case.method.upper()} {url}: ответ {response.status_code}'
+        )
+    if response.streaming:
+        b''.join(response.streaming_content)
+    return response
+
+
+def measure(case, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = make_client(case.user)
+    send(client, case, 0)
+    timings = []
+    queries = set()
+    for index in range(1, repeat + 1):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            send(client, case, index)
+            timings.append(time.perf_counter() - start)
+        queries.add(len(context.captured_queries))
+    # Память меряется отдельным запросом: tracemalloc замедляет код.
+    tracemalloc.start()
+    try:
+        send(client, case, repeat + 1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'queries': max(queries),
+        'p50_ms': round(percentiles[49] * 1e3, 3),
+        'p95_ms': round(percentiles[94] * 1e3, 3),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def check_coverage(project, cases):
+    """Каждый URL приложения должен быть в списке замеров."""
+    from importlib import import_module
+    module = import_module(URL_MODULES[project])
+    names = {
+        f'{module.app_name}:{pattern.name}' for pattern in module.urlpatterns
+    }
+    missing = names - {case.name for case in cases}
+    if missing:
+        raise SystemExit(
+            'Нет замеров для URL: ' + ', '.join(sorted(missing))
+        )
+
+
+def run(project, scale, repeat):
+    setup_django(project)
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    volumes = {
+        name: max(int(value * scale), 2)
+        for name, value in VOLUMES[project].items()
+    }
+    with TestDatabase():
+        start = time.perf_counter()
+        cases = CASES[project](volumes, repeat)
+        seeding = time.perf_counter() - start
+        check_coverage(project, cases)
+        views = {}
+        for case in cases:
+            key = f'{case.name} {case.method.upper()}'
+            if case.user is not None:
+                key += ' (auth)'
+            views[key] = measure(case, repeat)
+    return {
+        'project': project,
+        'volumes': volumes,
+        'repeat': repeat,
+        'seeding_s': round(seeding, 1),
+        'views': views,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Печатает таблицу с отклонениями и возвращает список регрессий."""
+    regressions = []
+    old_views = baseline.get('views', {}) if baseline else {}
+    print(f'{"URL":<44}{"запросы":>10}{"p50, мс":>11}{"p95, мс":>11}'
+          f'{"пик, КиБ":>12}')
+    for key, new in report['views'].items():
+        old = old_views.get(key)
+        cells = [f'{new["queries"]:>10}', f'{new["p50_ms"]:>11.1f}',
+                 f'{new["p95_ms"]:>11.1f}', f'{new["peak_kib"]:>12.1f}']
+        print(f'{key:<44}' + ''.join(cells))
+        if old is None:
+            continue
+        deltas = []
+        if new['queries'] > old['queries']:
+            deltas.append(f'запросов {old["queries"]} → {new["queries"]}')
+        # p95 по нескольким десяткам запросов слишком шумный, поэтому
+        # регрессию задержки ищем по медиане.
+        if (new['p50_ms'] > old['p50_ms'] * (1 + tolerance)
+                and new['p50_ms'] - old['p50_ms'] > MIN_LATENCY_DELTA_MS):
+            deltas.append(f'p50 {old["p50_ms"]} → {new["p50_ms"]} мс')
+        if new['peak_kib'] > old['peak_kib'] * (1 + tolerance):
+            deltas.append(f'память {old["peak_kib"]} → {new["peak_kib"]} КиБ')
+        if deltas:
+            print(f'{"":<4}РЕГРЕССИЯ: ' + '; '.join(deltas))
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--project', choices=sorted(SETTINGS_MODULES))
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='доля от полного объёма данных, например 0.01 для проверки'
+    )
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument(
+        '--tolerance', type=float, default=0.5,
+        help='допустимый рост медианы и пиковой памяти относительно эталона'
+    )
+    parser.add_argument(
+        '--update-baseline', action='store_true',
+        help='сохранить отчёт как новый эталон'
+    )
+    args = parser.parse_args()
+    if args.project is None:
+        status = 0
+        for project in sorted(SETTINGS_MODULES):
+            status |= subprocess.call(
+                [sys.executable, __file__, '--project', project]
+                + sys.argv[1:]
+            )
+        sys.exit(status)
+
+    report = run(args.project, args.scale, args.repeat)
+    REPORTS_DIR.mkdir(exist_ok=True)
+    report_path = REPORTS_DIR / f'{args.project}.json'
+    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    baseline_path = BASELINES_DIR / f'{args.project}.json'
+    baseline = None
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline['volumes'] != report['volumes']:
+            print('Объёмы данных не совпадают с эталоном, сравнение пропущено')
+            baseline = None
+    print(f'{args.project}: заполнение {report["seeding_s"]} с, '
+          f'отчёт {report_path.relative_to(ROOT_DIR)}')
+    regressions = compare(report, baseline, args.tolerance)
+    if args.update_baseline:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        baseline_path.write_text(report_path.read_text())
+        print(f'Эталон обновлён: {baseline_path.relative_to(ROOT_DIR)}')
+    elif regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
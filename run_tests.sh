@@ -21,27 +21,38 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
-        cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        # Проекты тестируются одновременно, а каждый ещё и в нескольких
+        # процессах pytest-xdist со своей базой. Вывод копится в файлах
+        # и печатается по порядку, чтобы логи проектов не перемешались.
+        workers="${PYTEST_WORKERS:-auto}"
+        news_log=$(mktemp)
+        note_log=$(mktemp)
+        (cd ya_news && DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:-yanews.settings}" \
+            pytest --tb=line -n "$workers" > "$news_log" 2>&1) &
+        news_pid=$!
+        # Классы TestCase целиком уходят в один процесс: setUpTestData
+        # выполняется для класса один раз.
+        (cd ya_note && DJANGO_SETTINGS_MODULE="yanote.settings" \
+            pytest --tb=line -n "$workers" --dist loadscope > "$note_log" 2>&1) &
+        note_pid=$!
+        wait $news_pid
+        news_status=$?
+        wait $note_pid
+        note_status=$?
+        cat "$news_log" "$note_log" 1>&2
+        rm -f "$news_log" "$note_log"
+        if [[ $news_status -ne 0 ]];
         then
-            cd ../ya_note
-            unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
-            then
-                exit 0
-            else
-                status=$?
-                print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
-                echo \`\`\` 1>&2
-                exit $status
-            fi
-        else
-            status=$?
             print_message " При запуске упали ваши тесты для проекта YaNews. Проверьте тесты этого проекта " "=" 1
             echo \`\`\` 1>&2
-            exit $status
+            exit $news_status
+        elif [[ $note_status -ne 0 ]];
+        then
+            print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
+            echo \`\`\` 1>&2
+            exit $note_status
+        else
+            exit 0
         fi
     else
         status=$?
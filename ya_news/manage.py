@@ -15,6 +15,11 @@ def main():
             "available on your PYTHONPATH environment variable? Did you "
             "forget to activate a virtual environment?"
         ) from exc
+    from yacommon.profiling import install_cpu_sampler
+
+    # runserver с автоперезагрузкой обслуживает запросы не в главном
+    # потоке, а обработчик сигнала ставится только из него.
+    install_cpu_sampler()
     execute_from_command_line(sys.argv)
 
 
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from .cache import bump_comments_version
 from .models import Comment, News
 
 
@@ -13,3 +14,10 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    readonly_fields = ('comments_count',)
+
+    def save_related(self, request, form, formsets, change):
+        """После правки комментариев в админке пересчитываем счётчик."""
+        super().save_related(request, form, formsets, change)
+        News.objects.filter(pk=form.instance.pk).recount_comments()
+        bump_comments_version(form.instance.pk)
@@ -0,0 +1,215 @@
+import time
+from collections import namedtuple
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from yacommon.replicas import is_reading_from_replica, read_database
+
+from .models import Comment, News
+from .pagination import KeysetPaginator
+
+VERSION_KEY = 'news:{pk}:comments:version'
+FRAGMENT_KEY = 'news:{pk}:comments:{version}:{source}:{cursor}'
+HITS_KEY = 'news:comments-cache:hits'
+MISSES_KEY = 'news:comments-cache:misses'
+PAGE_KEY = 'news:page:{etag}'
+
+CachedComment = namedtuple('CachedComment', ('pk', 'author_id', 'html'))
+
+
+def _increment(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        return cache.incr(key)
+
+
+def get_comments_version(news_pk):
+    """
+    Текущая версия блока комментариев новости.
+
+    Начальное значение берётся из времени, чтобы после вытеснения ключа
+    из кеша не совпасть со старой версией и не отдать устаревший блок.
+    """
+    key = VERSION_KEY.format(pk=news_pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def read_source():
+    """
+    Чьи данные видит запрос: основной базы или реплики.
+
+    Версию блока комментариев сбрасывает запись в основную базу, и
+    отстающая реплика под новой версией отдала бы старые данные. Поэтому
+    всё, что построено по реплике, кешируется отдельно от основной базы
+    и не дольше REPLICA_PIN_SECONDS: за это время реплики успевают
+    догнать основную базу, на этом же держится закрепление пишущих
+    клиентов.
+    """
+    alias = read_database()
+    if not is_reading_from_replica():
+        return alias
+    return f'{alias}:{int(time.time() // settings.REPLICA_PIN_SECONDS)}'
+
+
+def bump_comments_version(news_pk):
+    """Сбрасывает закешированные страницы комментариев новости."""
+    key = VERSION_KEY.format(pk=news_pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_comments_page(news, cursor=None):
+    """
+    Страница комментариев с отрендеренным HTML каждого комментария.
+
+    В кеш попадает только общая для всех пользователей часть, ссылки на
+    редактирование шаблон добавляет сам по `author_id`. Блок читается
+    с базы запроса и кешируется отдельно для неё, см. read_source().
+    """
+    key = FRAGMENT_KEY.format(
+        pk=news.pk,
+        version=get_comments_version(news.pk),
+        source=read_source(),
+        cursor=md5((cursor or '').encode()).hexdigest(),
+    )
+    page = cache.get(key)
+    if page is not None:
+        _increment(HITS_KEY)
+        return page
+    _increment(MISSES_KEY)
+    paginator = KeysetPaginator(
+        news.comment_set.using(read_database()).select_related('author'),
+        ('created', 'pk'),
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+    )
+    page = paginator.get_page(cursor)
+    template = get_template('news/includes/comment.html')
+    # Один контекст на всю страницу: отдельный render() на каждый
+    # комментарий заново строил бы контекст и его служебные словари.
+    context = make_context({}, autoescape=template.backend.engine.autoescape)
+    rendered = []
+    for comment in page.object_list:
+        context['comment'] = comment
+        rendered.append(CachedComment(
+            comment.pk, comment.author_id, template.template.render(context)
+        ))
+    page.object_list = rendered
+    cache.set(key, page, settings.COMMENTS_CACHE_TIMEOUT)
+    return page
+
+
+def get_cache_stats():
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def _page_state(rows, versions, last_comment=None):
+    """
+    Версия и время изменения страницы по строкам (pk, date, счётчик).
+
+    В версию входят и версии блоков комментариев: их сбрасывают как
+    новые комментарии, так и правка новости в админке.
+    """
+    moments = [
+        timezone.make_aware(datetime.combine(row[1], datetime.min.time()))
+        for row in rows
+    ]
+    if last_comment is not None:
+        moments.append(last_comment)
+    return (rows, versions), max(moments, default=None)
+
+
+def news_list_state(request):
+    """Главная не обращается к комментариям: хватает счётчиков."""
+    rows = list(News.objects.values_list('pk', 'date', 'comments_count')[
+        :settings.NEWS_COUNT_ON_HOME_PAGE
+    ])
+    versions = cache.get_many([VERSION_KEY.format(pk=row[0]) for row in rows])
+    return _page_state(rows, sorted(versions.items()))
+
+
+def news_detail_state(request, pk):
+    last_comment = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by('-created').values('created')[:1]
+    rows = list(News.objects.filter(pk=pk).annotate(
+        last_comment=Subquery(last_comment)
+    ).values_list('pk', 'date', 'comments_count', 'last_comment'))
+    if not rows:
+        return None
+    return _page_state(
+        [row[:3] for row in rows], get_comments_version(pk), rows[0][3]
+    )
+
+
+def anonymous_http_cache(get_state):
+    """
+    Условные ответы и кеш страниц для анонимных GET-запросов.
+
+    `get_state(request, **kwargs)` одним запросом к базе возвращает
+    версию страницы и время её изменения или None, если представление
+    должно ответить само. По ним строятся ETag и Last-Modified. Если
+    клиент прислал совпадающие заголовки, ответ 304 отдаётся без вызова
+    представления, иначе готовая страница берётся из кеша по ETag.
+    Авторизованным пользователям страница показывается персональной,
+    поэтому для них представление вызывается как обычно.
+
+    Версия и страница строятся по одной базе, выбранной для запроса, а в
+    ETag входит её метка из read_source(): страница с реплики не
+    выдаётся за страницу основной базы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            state = get_state(request, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            version, last_modified = state
+            etag = md5(
+                f'{read_source()}:{version}:{request.get_full_path()}'.encode()
+            ).hexdigest()
+            timestamp = last_modified and int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=quote_etag(etag), last_modified=timestamp
+            )
+            if response is None:
+                key = PAGE_KEY.format(etag=etag)
+                response = cache.get(key)
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                    if hasattr(response, 'render'):
+                        response.render()
+                    if response.status_code == 200 and not response.cookies:
+                        cache.set(
+                            key, response, settings.NEWS_PAGE_CACHE_TIMEOUT
+                        )
+            response['ETag'] = quote_etag(etag)
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,51 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Общий пул потоков асинхронных представлений."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.NEWS_ASYNC_WORKERS,
+                    thread_name_prefix='news-view',
+                )
+    return _executor
+
+
+def _call(func, args, kwargs):
+    # Соединения с базой у каждого потока пула свои и живут CONN_MAX_AGE,
+    # как и в потоках WSGI-сервера: проверяем их до и после запроса.
+    close_old_connections()
+    try:
+        response = func(*args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """
+    Выполняет синхронное представление в пуле и ждёт ответ, не занимая цикл.
+
+    Переменные контекста (например, выбор реплики) передаются в поток
+    пула. TemplateResponse рендерится там же, чтобы шаблоны не
+    выполнялись в единственном потоке sync_to_async.
+    """
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        get_executor(), partial(context.run, _call, func, args, kwargs)
+    )
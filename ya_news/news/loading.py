@@ -0,0 +1,206 @@
+import json
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection, transaction
+
+from .cache import bump_comments_version
+from .models import Comment, News
+
+MODELS = {'news.news': News, 'news.comment': Comment}
+READ_SIZE = 1 << 16
+
+
+class FixtureError(ValueError):
+    """Файл не является фикстурой новостей в формате JSON."""
+
+
+class _Buffer:
+    """Окно в текстовый поток, которое дочитывается по мере разбора."""
+
+    def __init__(self, stream, read_size):
+        self.stream = stream
+        self.read_size = read_size
+        self.text = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        chunk = self.stream.read(self.read_size)
+        self.eof = not chunk
+        self.text = self.text[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Первый непробельный символ или '' в конце потока."""
+        while True:
+            while (self.position < len(self.text)
+                   and self.text[self.position].isspace()):
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if self.eof:
+                return ''
+            self.fill()
+
+    def decode(self, decoder):
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise FixtureError('Некорректный JSON.')
+                self.fill()
+                continue
+            if end == len(self.text) and not self.eof:
+                # Число у края буфера могло быть прочитано не целиком.
+                self.fill()
+                continue
+            self.position = end
+            return value
+
+
+def iter_objects(stream, read_size=READ_SIZE):
+    """
+    Лениво разбирает JSON-массив объектов из текстового потока.
+
+    В памяти держится только непрочитанный остаток буфера, поэтому
+    размер файла не важен.
+    """
+    buffer = _Buffer(stream, read_size)
+    decoder = json.JSONDecoder()
+    if buffer.peek() != '[':
+        raise FixtureError('Фикстура должна быть JSON-массивом.')
+    buffer.position += 1
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield buffer.decode(decoder)
+        char = buffer.peek()
+        if char == ']':
+            return
+        if not char:
+            raise FixtureError('Файл оборвался посреди массива.')
+        if char != ',':
+            raise FixtureError('Записи должны разделяться запятой.')
+        buffer.position += 1
+
+
+def build(data):
+    """Несохранённый объект модели из записи фикстуры."""
+    if not isinstance(data, dict) or 'model' not in data:
+        raise FixtureError('Запись фикстуры должна быть объектом с model.')
+    model = MODELS.get(str(data['model']).lower())
+    if model is None:
+        raise FixtureError(f'Модель {data["model"]} не поддерживается.')
+    try:
+        obj = model(pk=model._meta.pk.to_python(data.get('pk')))
+        for name, value in data.get('fields', {}).items():
+            field = model._meta.get_field(name)
+            if field.is_relation and not isinstance(value, int):
+                raise ValidationError('ожидается первичный ключ')
+            setattr(obj, field.attname, field.to_python(value))
+    except (FieldDoesNotExist, ValidationError) as error:
+        raise FixtureError(f'{data["model"]}: {error}')
+    return obj
+
+
+def save_batch(model, batch):
+    """
+    Вставляет пачку одним bulk_create, а уже существующие записи обновляет.
+
+    Как и loaddata, запись с занятым первичным ключом заменяет прежнюю.
+    """
+    pks = [obj.pk for obj in batch if obj.pk is not None]
+    existing = set(
+        model.objects.filter(pk__in=pks).values_list('pk', flat=True)
+    ) if pks else set()
+    model.objects.bulk_create(
+        [obj for obj in batch if obj.pk not in existing]
+    )
+    if existing:
+        model.objects.bulk_update(
+            [obj for obj in batch if obj.pk in existing],
+            [field.name for field in model._meta.concrete_fields
+             if not field.primary_key],
+        )
+
+
+@contextmanager
+def deferred_indexes(*models, enabled=True):
+    """
+    Снимает вторичные индексы на время загрузки и строит их заново.
+
+    Построить индекс по готовой таблице быстрее, чем поддерживать его при
+    каждой вставке. Работает только на SQLite и только внутри транзакции:
+    при ошибке индексы вернёт откат. Уникальные индексы не трогаются.
+    """
+    if not enabled or connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            "AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%' "
+            f"AND tbl_name IN ({', '.join(['%s'] * len(models))})",
+            [model._meta.db_table for model in models],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    yield
+    with connection.cursor() as cursor:
+        for _, sql in indexes:
+            cursor.execute(sql)
+
+
+def load_fixture(stream, batch_size=None, defer_indexes=True):
+    """
+    Загружает новости и комментарии из фикстуры в одной транзакции.
+
+    Записи читаются потоком и сохраняются пачками. Новости всегда
+    сохраняются раньше комментариев: иначе SQLite при вставке каждой
+    новости ищет ссылающиеся на неё комментарии, а индекс по ним на время
+    загрузки снят. После загрузки у затронутых новостей пересчитываются
+    счётчики комментариев и сбрасывается кеш. Возвращает число записей
+    по моделям.
+    """
+    batch_size = batch_size or settings.NEWS_FIXTURE_BATCH_SIZE
+    batches = {model: [] for model in MODELS.values()}
+    counts = dict.fromkeys(MODELS.values(), 0)
+    touched = set()
+
+    def flush(*models):
+        for model in models:
+            if batches[model]:
+                save_batch(model, batches[model])
+                counts[model] += len(batches[model])
+                batches[model].clear()
+
+    def recount():
+        # Запись новости затирает счётчик, даже если комментариев в
+        # фикстуре нет. Ключи передаются пачками из-за лимита параметров.
+        pks = sorted(touched - {None})
+        for start in range(0, len(pks), batch_size):
+            News.objects.filter(
+                pk__in=pks[start:start + batch_size]
+            ).recount_comments()
+
+    def invalidate():
+        for pk in touched - {None}:
+            bump_comments_version(pk)
+
+    with transaction.atomic():
+        with deferred_indexes(*MODELS.values(), enabled=defer_indexes):
+            for data in iter_objects(stream):
+                obj = build(data)
+                touched.add(obj.pk if isinstance(obj, News) else obj.news_id)
+                batches[type(obj)].append(obj)
+                if len(batches[type(obj)]) == batch_size:
+                    flush(News, type(obj))
+            flush(News, Comment)
+        recount()
+        transaction.on_commit(invalidate)
+    return counts
@@ -0,0 +1,49 @@
+import gzip
+import sys
+from argparse import BooleanOptionalAction
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.loading import FixtureError, load_fixture
+from news.models import Comment, News
+
+
+def open_fixture(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает новости и комментарии из JSON-фикстуры '
+        'в формате dumpdata.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл фикстуры (.json или .json.gz), - для stdin.'
+        )
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--defer-indexes', action=BooleanOptionalAction, default=True,
+            help='Строить вторичные индексы после загрузки (только SQLite).'
+        )
+
+    def handle(self, *args, **options):
+        source = open_fixture(options['path'])
+        try:
+            counts = load_fixture(
+                source, options['batch_size'], options['defer_indexes']
+            )
+        except FixtureError as error:
+            raise CommandError(str(error))
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(
+            f'Загружено новостей: {counts[News]}, '
+            f'комментариев: {counts[Comment]}'
+        )
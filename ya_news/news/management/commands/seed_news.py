@@ -0,0 +1,44 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from news.seeding import BATCH_SIZE, seed_news
+
+
+def moment(value):
+    value = datetime.fromisoformat(value)
+    return value if timezone.is_aware(value) else timezone.make_aware(value)
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу новостями, комментариями и пользователями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1_000)
+        parser.add_argument('--comments', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--now', type=moment,
+            help='Момент ISO 8601, от которого отсчитываются даты.'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            seeded = seed_news(
+                options['news'],
+                options['comments'],
+                options['users'],
+                seed=options['seed'],
+                now=options['now'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            f'Создано пользователей: {len(seeded.users)}, '
+            f'новостей: {len(seeded.news)}, '
+            f'комментариев: {len(seeded.comments)}'
+        )
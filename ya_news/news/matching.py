@@ -0,0 +1,116 @@
+import os
+from collections import deque
+from threading import Lock
+
+from django.conf import settings
+
+
+class AhoCorasick:
+    """
+    Поиск всех слов словаря за один проход по тексту.
+
+    Автомат строится один раз, после чего время проверки зависит только
+    от длины текста и числа найденных совпадений, но не от размера словаря.
+    """
+
+    def __init__(self, words):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word in words:
+            if word:
+                self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        if word not in self._output[state]:
+            self._output[state] += (word,)
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом бора в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def finditer(self, text):
+        """Возвращает совпадения в виде кортежей (начало, конец, слово)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word in output[state]:
+                yield position - len(word) + 1, position + 1, word
+
+    def search(self, text):
+        """Первое найденное совпадение или None."""
+        return next(self.finditer(text), None)
+
+
+def read_words(path):
+    """Читает словарь: одно слово в строке, `#` начинает комментарий."""
+    with open(path, encoding='utf-8') as file:
+        return [
+            word
+            for word in (line.split('#', 1)[0].strip().lower()
+                         for line in file)
+            if word
+        ]
+
+
+class WordListMatcher:
+    """
+    Автомат для словаря из настройки `BAD_WORDS_FILE`.
+
+    Если файл не задан, используется встроенный список. При изменении
+    файла автомат пересобирается при следующем обращении без перезапуска.
+    """
+
+    def __init__(self, default_words):
+        self.default_words = tuple(word.lower() for word in default_words)
+        self._signature = None
+        self._matcher = None
+        self._lock = Lock()
+
+    def _current_signature(self):
+        path = getattr(settings, 'BAD_WORDS_FILE', None)
+        if not path:
+            return (None,)
+        stat = os.stat(path)
+        return (os.fspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        signature = self._current_signature()
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    path = signature[0]
+                    words = read_words(path) if path else self.default_words
+                    self._matcher = AhoCorasick(words)
+                    self._signature = signature
+        return self._matcher
+
+    def search(self, text):
+        return self.get().search(text)
+
+    def finditer(self, text):
+        return self.get().finditer(text)
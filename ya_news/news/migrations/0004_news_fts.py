@@ -0,0 +1,16 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:40
+
+from django.db import migrations
+
+from yacommon.search import fts_migration
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        fts_migration('news_news'),
+    ]
@@ -2,15 +2,47 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """
+        Только поля, которые выводятся в списках, и начало текста.
+
+        Полный текст новости списку не нужен: анонс в шаблоне строится
+        из `excerpt`, который база обрезает сама.
+        """
+        return self.only('title', 'date', 'comments_count').annotate(
+            excerpt=Substr('text', 1, settings.NEWS_EXCERPT_LENGTH)
+        )
+
+    def recount_comments(self):
+        """Пересчитывает счётчик комментариев одним UPDATE."""
+        comments = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.update(comments_count=Coalesce(Subquery(comments), 0))
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -28,10 +60,17 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
     )
     text = models.TextField()
-    created = models.DateTimeField(auto_now_add=True)
+    # Не auto_now_add: тогда bulk_create затирал бы заданное время.
+    created = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,85 @@
+from django.core import signing
+from django.db.models import Q
+from django.http import Http404
+
+CURSOR_SALT = 'news.pagination.cursor'
+
+
+class KeysetPage:
+    """Страница выдачи и курсор для перехода к следующей."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей сортировки последней записи страницы,
+    поэтому каждая следующая страница выбирается по индексу так же
+    быстро, как первая.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = [field.startswith('-') for field in ordering]
+        self.per_page = per_page
+
+    def get_page(self, cursor=None):
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode(cursor)))
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode(object_list[-1])
+        return KeysetPage(object_list, next_cursor)
+
+    def encode(self, obj):
+        values = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            values.append(value)
+        return signing.dumps(values, salt=CURSOR_SALT)
+
+    def decode(self, cursor):
+        try:
+            values = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise Http404('Некорректный курсор.')
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise Http404('Некорректный курсор.')
+        return values
+
+    def _after(self, values):
+        """
+        Условие «строго после курсора» для составного ключа.
+
+        Отдельное нестрогое сравнение по первому полю позволяет базе
+        начать просмотр индекса сразу с нужного места.
+        """
+        bound = 'lte' if self.descending[0] else 'gte'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            lookup = 'lt' if self.descending[index] else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for prev_field, prev_value in zip(self.fields, values[:index]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return Q(**{f'{self.fields[0]}__{bound}': values[0]}) & condition
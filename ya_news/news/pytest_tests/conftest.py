@@ -1,45 +1,100 @@
+import sys
+import time
+from collections import namedtuple
+from copy import deepcopy
 from datetime import timedelta
+from typing import Optional
 
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
 from django.test import Client
 from django.utils import timezone
 
 from news.models import Comment, News
+from news.seeding import Seeded, seed_news
 
+FIXTURE_REPORT_SIZE = 10
 
-@pytest.fixture
-def author(django_user_model: type[get_user_model()]) -> get_user_model():
-    return django_user_model.objects.create(username='Автор')
+SharedData = namedtuple(
+    'SharedData', ('admin', 'author', 'news', 'comment', 'all_news')
+)
+# Имя фикстуры -> [суммарное время подготовки, число подготовок].
+fixture_durations = {}
 
 
-@pytest.fixture
-def author_client(author: User, client: Client) -> Client:
-    client.force_login(author)
-    return client
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef):
+    start = time.perf_counter()
+    yield
+    duration = fixture_durations.setdefault(fixturedef.argname, [0.0, 0])
+    duration[0] += time.perf_counter() - start
+    duration[1] += 1
 
 
-@pytest.fixture
-def news() -> News:
+def pytest_sessionfinish(session):
+    # Процесс pytest-xdist передаёт свои замеры главному процессу.
+    if hasattr(session.config, 'workeroutput'):
+        session.config.workeroutput['fixture_durations'] = fixture_durations
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node):
+    for name, (seconds, count) in node.workeroutput.get(
+        'fixture_durations', {}
+    ).items():
+        duration = fixture_durations.setdefault(name, [0.0, 0])
+        duration[0] += seconds
+        duration[1] += count
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not fixture_durations:
+        return
+    terminalreporter.write_sep('=', 'Подготовка фикстур')
+    for name, (seconds, count) in sorted(
+        fixture_durations.items(), key=lambda item: -item[1][0]
+    )[:FIXTURE_REPORT_SIZE]:
+        terminalreporter.write_line(f'{seconds:8.3f} с {count:6} раз  {name}')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def create_admin() -> User:
+    # Хеширование пароля — самая долгая часть подготовки теста.
+    return get_user_model().objects.create_superuser(
+        username='admin', email='admin@example.com', password='password'
+    )
+
+
+def create_author() -> User:
+    return get_user_model().objects.create(username='Автор')
+
+
+def create_news() -> News:
     return News.objects.create(
         title='Заголовок',
         text='Текст новости',
     )
 
 
-@pytest.fixture
-def comment(author: User, news: News) -> Comment:
-    return Comment.objects.create(
+def create_comment(author: User, news: News) -> Comment:
+    comment = Comment.objects.create(
         news=news,
         author=author,
         text='Текст'
     )
+    News.objects.filter(pk=news.pk).recount_comments()
+    return comment
 
 
-@pytest.fixture
-def all_news() -> News:
+def create_all_news() -> list[News]:
     today = timezone.localdate()
     all_news: list[News] = [
         News(
@@ -52,14 +107,106 @@ def all_news() -> News:
     return News.objects.bulk_create(all_news)
 
 
+@pytest.fixture(scope='module')
+def shared_data(django_db_setup, django_db_blocker) -> SharedData:
+    """
+    Общие данные модуля, как setUpTestData в YaNote.
+
+    Модуль подключает их через pytest.mark.usefixtures('shared_data'):
+    так фикстура модульного уровня создаётся раньше транзакции теста.
+    Данные создаются один раз в транзакции, которая откатывается после
+    модуля, а каждый тест выполняется в своей точке сохранения внутри неё.
+    """
+    atomic = transaction.atomic()
+    with django_db_blocker.unblock():
+        atomic.__enter__()
+        try:
+            author = create_author()
+            news = create_news()
+            comment = create_comment(author, news)
+            news.refresh_from_db()
+            data = SharedData(
+                create_admin(), author, news, comment, create_all_news()
+            )
+        except BaseException:
+            atomic.__exit__(*sys.exc_info())
+            raise
+    yield data
+    with django_db_blocker.unblock():
+        transaction.set_rollback(True)
+        atomic.__exit__(None, None, None)
+
+
 @pytest.fixture
-def all_comment(news: News, author: User) -> Comment:
+def shared_copy(request, db) -> Optional[SharedData]:
+    """Копия общих данных для теста или None, если модуль их не использует."""
+    if 'shared_data' not in request.fixturenames:
+        return None
+    marker = request.node.get_closest_marker('django_db')
+    if marker is not None and marker.kwargs.get('transaction'):
+        pytest.fail('Общие данные модуля несовместимы с transaction=True.')
+    # Тест может менять объекты, поэтому каждому достаётся своя копия.
+    return deepcopy(request.getfixturevalue('shared_data'))
+
+
+@pytest.fixture
+def admin_user(shared_copy: Optional[SharedData]) -> User:
+    """Замена фикстуры pytest-django, умеющая брать общие данные."""
+    return shared_copy.admin if shared_copy else create_admin()
+
+
+@pytest.fixture
+def author(shared_copy: Optional[SharedData]) -> User:
+    return shared_copy.author if shared_copy else create_author()
+
+
+@pytest.fixture
+def author_client(author: User, client: Client) -> Client:
+    client.force_login(author)
+    return client
+
+
+@pytest.fixture
+def news(shared_copy: Optional[SharedData]) -> News:
+    return shared_copy.news if shared_copy else create_news()
+
+
+@pytest.fixture
+def comment(
+    shared_copy: Optional[SharedData], author: User, news: News
+) -> Comment:
+    if shared_copy:
+        return shared_copy.comment
+    return create_comment(author, news)
+
+
+@pytest.fixture
+def all_news(shared_copy: Optional[SharedData]) -> list[News]:
+    return shared_copy.all_news if shared_copy else create_all_news()
+
+
+@pytest.fixture
+def all_comment(news: News, author: User) -> list[Comment]:
     now = timezone.now()
-    for index in range(2):
-        comment: Comment = Comment.objects.create(
+    comments = Comment.objects.bulk_create(
+        Comment(
             news=news,
             author=author,
-            text=f'Tекст {index}'
+            text=f'Tекст {index}',
+            created=now + timedelta(days=index),
         )
-        comment.created = now + timedelta(days=index)
-        comment.save()
+        for index in range(2)
+    )
+    News.objects.filter(pk=news.pk).recount_comments()
+    return comments
+
+
+@pytest.fixture
+def seed_volumes() -> dict:
+    """Объём данных для seeded_news; тест меняет его через parametrize."""
+    return {'news': 20, 'comments': 200, 'users': 5}
+
+
+@pytest.fixture
+def seeded_news(db, seed_volumes: dict) -> Seeded:
+    return seed_news(**seed_volumes)
@@ -0,0 +1,137 @@
+import socketserver
+import threading
+import time
+
+
+class RedisStubServer(socketserver.ThreadingTCPServer):
+    """
+    Сервер с подмножеством команд Redis для тестов кеша.
+
+    Данные хранятся в словаре процесса, срок жизни ключей проверяется
+    при обращении.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RedisStubHandler)
+        self.data = {}
+        self.lock = threading.Lock()
+        self.commands = []
+        # Команда, после выполнения которой сервер обрывает соединение.
+        self.drop_reply = None
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f'redis://{host}:{port}/1'
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def lookup(self, key):
+        value, expires = self.data.get(key, (None, None))
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, name, args):
+        self.commands.append(name)
+        handler = getattr(self, f'command_{name.lower()}', None)
+        if handler is None:
+            return ValueError(f'ERR unknown command {name}')
+        with self.lock:
+            return handler(*args)
+
+    def command_ping(self):
+        return 'PONG'
+
+    def command_select(self, db):
+        return 'OK'
+
+    def command_get(self, key):
+        return self.lookup(key)
+
+    def command_set(self, key, value, *flags):
+        flags = [flag.upper() for flag in flags]
+        if b'NX' in flags and self.lookup(key) is not None:
+            return None
+        expires = None
+        if b'PX' in flags:
+            milliseconds = int(flags[flags.index(b'PX') + 1])
+            expires = time.monotonic() + milliseconds / 1000
+        self.data[key] = (value, expires)
+        return 'OK'
+
+    def command_del(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def command_exists(self, key):
+        return int(self.lookup(key) is not None)
+
+    def command_incrby(self, key, delta):
+        value = int(self.lookup(key) or 0) + int(delta)
+        expires = self.data.get(key, (None, None))[1]
+        self.data[key] = (str(value).encode(), expires)
+        return value
+
+    def command_mget(self, *keys):
+        return [self.lookup(key) for key in keys]
+
+    def command_pexpire(self, key, milliseconds):
+        if self.lookup(key) is None:
+            return 0
+        expires = time.monotonic() + int(milliseconds) / 1000
+        self.data[key] = (self.data[key][0], expires)
+        return 1
+
+    def command_persist(self, key):
+        value = self.lookup(key)
+        if value is None or self.data[key][1] is None:
+            return 0
+        self.data[key] = (value, None)
+        return 1
+
+    def command_flushdb(self):
+        self.data.clear()
+        return 'OK'
+
+
+class RedisStubHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            name = args[0].decode()
+            reply = self.server.execute(name, args[1:])
+            if name == self.server.drop_reply:
+                self.server.drop_reply = None
+                return
+            self.wfile.write(encode(reply))
+
+
+def encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, ValueError):
+        return f'-{reply}\r\n'.encode()
+    if isinstance(reply, str):
+        return f'+{reply}\r\n'.encode()
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    return b'*%d\r\n' % len(reply) + b''.join(map(encode, reply))
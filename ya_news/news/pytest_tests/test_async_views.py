@@ -0,0 +1,69 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.urls import reverse
+
+from news.executor import run_in_executor
+from news.models import News
+from news.views import (
+    AsyncNewsDetailView, AsyncNewsList, NewsDetailView, NewsList
+)
+from yanews.routers import ReplicaRouter, read_from_replicas
+
+NEWS_DETAIL_URL = 'news:detail'
+NEWS_HOME_URL = 'news:home'
+REPLICA = 'replica'
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def get(view_class, url, user, **kwargs):
+    # Иначе анонимный ответ второго представления возьмётся из кеша.
+    cache.clear()
+    request = RequestFactory().get(url)
+    request.user = user
+    view = view_class.as_view()
+    if view_class in (AsyncNewsList, AsyncNewsDetailView):
+        view = async_to_sync(view)
+    return view(request, **kwargs)
+
+
+def test_async_home_matches_sync(all_news):
+    url = reverse(NEWS_HOME_URL)
+    sync = get(NewsList, url, AnonymousUser())
+    response = get(AsyncNewsList, url, AnonymousUser())
+    assert response.is_rendered
+    assert response.template_name == sync.template_name
+    assert list(response.context_data['object_list']) == list(
+        sync.context_data['object_list']
+    )
+    assert response.content == sync.content
+
+
+@pytest.mark.parametrize(
+    'user',
+    (pytest.lazy_fixture('admin_user'), AnonymousUser()),
+)
+def test_async_detail_matches_sync(all_comment, news, user):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    sync = get(NewsDetailView, url, user, pk=news.id)
+    response = get(AsyncNewsDetailView, url, user, pk=news.id)
+    assert response.template_name == sync.template_name
+    assert set(response.context_data) == set(sync.context_data)
+    assert response.context_data['object'] == sync.context_data['object']
+    assert [
+        comment.html
+        for comment in response.context_data['comments'].object_list
+    ] == [
+        comment.html for comment in sync.context_data['comments'].object_list
+    ]
+
+
+def test_executor_keeps_context(settings):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    router = ReplicaRouter()
+    with read_from_replicas():
+        alias = async_to_sync(run_in_executor)(router.db_for_read, News)
+    assert alias == REPLICA
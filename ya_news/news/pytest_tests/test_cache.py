@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from news.pytest_tests.redis_stub import RedisStubServer
+
+NEWS_DETAIL_URL = 'news:detail'
+NEWS_HOME_URL = 'news:home'
+COMMENT_TEXT = 'Текст комментария'
+
+
+@pytest.fixture
+def redis_server():
+    server = RedisStubServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(params=('locmem', 'file', 'redis'))
+def cache_backend(request, settings, tmp_path):
+    config = dict(settings.CACHE_BACKENDS[request.param])
+    if request.param == 'file':
+        config['LOCATION'] = tmp_path
+    elif request.param == 'redis':
+        config['LOCATION'] = request.getfixturevalue('redis_server').url
+    settings.CACHES = {'default': config}
+    cache.clear()
+    return request.param
+
+
+def test_backend_operations(cache_backend):
+    assert cache.get('key') is None
+    cache.set('key', {'value': 1})
+    assert cache.get('key') == {'value': 1}
+    assert not cache.add('key', 'other')
+    assert cache.add('counter', 1)
+    assert cache.incr('counter', 10) == 11
+    with pytest.raises(ValueError):
+        cache.incr('missing')
+    assert cache.get_many(['key', 'counter', 'missing']) == {
+        'key': {'value': 1}, 'counter': 11
+    }
+    assert cache.delete('key')
+    assert cache.get('key') is None
+    cache.set('expired', 'value', 0)
+    assert cache.get('expired') is None
+    cache.clear()
+    assert cache.get('counter') is None
+
+
+def test_redis_backend_uses_one_connection(redis_server, settings):
+    settings.CACHES = {'default': {
+        'BACKEND': 'yanews.redis_cache.RedisCache',
+        'LOCATION': redis_server.url,
+    }}
+    cache.set('key', 'value')
+    cache.get('key')
+    assert redis_server.commands == ['SELECT', 'SET', 'GET']
+
+
+def test_redis_backend_retries_only_idempotent_commands(
+    redis_server, settings
+):
+    settings.CACHES = {'default': {
+        'BACKEND': 'yanews.redis_cache.RedisCache',
+        'LOCATION': redis_server.url,
+    }}
+    cache.set('counter', 1)
+    redis_server.drop_reply = 'GET'
+    assert cache.get('counter') == 1
+    redis_server.drop_reply = 'INCRBY'
+    with pytest.raises(EOFError):
+        cache.incr('counter')
+    assert cache.get('counter') == 2
+    redis_server.drop_reply = 'SET'
+    with pytest.raises(EOFError):
+        cache.add('key', 'value')
+    assert not cache.add('key', 'other')
+    assert cache.get('key') == 'value'
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_with_backend(cache_backend, client, news):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    first = client.get(url)
+    second = client.get(url)
+    assert second.status_code == HTTPStatus.OK
+    assert second.templates == []
+    assert second.content == first.content
+    assert second['ETag'] == first['ETag']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', (NEWS_HOME_URL, NEWS_DETAIL_URL))
+def test_conditional_request_skips_rendering(client, news, name):
+    url = reverse(name, args=(news.id,) if name == NEWS_DETAIL_URL else None)
+    response = client.get(url)
+    assert response.templates
+    for headers in (
+        {'HTTP_IF_NONE_MATCH': response['ETag']},
+        {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+    ):
+        not_modified = client.get(url, **headers)
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+        assert not_modified.templates == []
+
+
+@pytest.mark.django_db
+def test_new_comment_changes_validators(author_client, news):
+    # Фикстура client уже авторизована в author_client.
+    client = Client()
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    home_url = reverse(NEWS_HOME_URL)
+    etag = client.get(url)['ETag']
+    home_etag = client.get(home_url)['ETag']
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert COMMENT_TEXT in response.content.decode()
+    assert client.get(home_url)['ETag'] != home_etag
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_are_not_cached(author_client, news):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    response = author_client.get(url)
+    assert not response.has_header('ETag')
+    assert author_client.get(url).templates
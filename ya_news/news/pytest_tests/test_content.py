@@ -1,11 +1,26 @@
+from datetime import timedelta
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
+from django.http import QueryDict
+from django.template.defaultfilters import truncatewords
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from news.forms import CommentForm
+from news.models import Comment, News
 
+NEWS_ARCHIVE_URL = 'news:archive'
+NEWS_DELETE_URL = 'news:delete'
 NEWS_DETAIL_URL = 'news:detail'
+NEWS_EDIT_URL = 'news:edit'
 NEWS_HOME_URL = 'news:home'
+NEWS_METRICS_URL = 'news:comments_cache_metrics'
+NEWS_SEARCH_URL = 'news:search'
+
+pytestmark = pytest.mark.usefixtures('shared_data')
 
 
 @pytest.mark.django_db
@@ -29,6 +44,33 @@ def test_news_order(client):
     assert sorted_dates == all_dates
 
 
+@pytest.mark.django_db
+def test_home_page_loads_only_excerpt(client, news, settings):
+    text = 'Слово ' * 1_000
+    News.objects.filter(pk=news.pk).update(
+        text=text, date=news.date + timedelta(days=1)
+    )
+    response = client.get(reverse(NEWS_HOME_URL))
+    item = response.context['object_list'][0]
+    assert item == news
+    assert item.get_deferred_fields() == {'text'}
+    assert len(item.excerpt) == settings.NEWS_EXCERPT_LENGTH
+    # Анонс такой же, как если бы обрезался полный текст.
+    assert truncatewords(text, 15) in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_comment')
+def test_home_page_does_not_touch_comments(client, news):
+    news.refresh_from_db()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse(NEWS_HOME_URL))
+    assert 'news_comment' not in ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+    assert f'Комментариев: {news.comments_count}' in response.content.decode()
+
+
 @pytest.mark.django_db
 @pytest.mark.usefixtures('all_comment')
 def test_comments_order(client, news):
@@ -54,3 +96,102 @@ def test_form_availability_for_author_client(news, author_client):
     response = author_client.get(url)
     assert ('form' in response.context) is True
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_news')
+def test_archive_pages_cover_all_news(client, settings):
+    settings.NEWS_COUNT_ON_ARCHIVE_PAGE = 3
+    url = reverse(NEWS_ARCHIVE_URL)
+    query = QueryDict(mutable=True)
+    seen = []
+    while True:
+        response = client.get(url, query)
+        page = response.context['page']
+        assert len(page) <= settings.NEWS_COUNT_ON_ARCHIVE_PAGE
+        seen.extend(page.object_list)
+        if not page.has_next:
+            break
+        query['cursor'] = page.next_cursor
+    assert len(seen) == len(set(seen)) == News.objects.count()
+    all_dates = [news.date for news in seen]
+    assert all_dates == sorted(all_dates, reverse=True)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_comment')
+def test_comments_are_paginated(client, news, settings):
+    # Все комментарии, кроме последнего, помещаются на первую страницу.
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = news.comment_set.count() - 1
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    first_page = client.get(url).context['comments']
+    assert first_page.has_next
+    second_page = client.get(
+        url, {'cursor': first_page.next_cursor}
+    ).context['comments']
+    assert not second_page.has_next
+    first_id = first_page.object_list[0].pk
+    second_id = second_page.object_list[0].pk
+    assert Comment.objects.get(pk=first_id).created < (
+        Comment.objects.get(pk=second_id).created
+    )
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(client):
+    response = client.get(reverse(NEWS_ARCHIVE_URL), {'cursor': 'garbage'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_comment')
+def test_comments_block_is_cached(admin_client, news):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    first_response = admin_client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        second_response = admin_client.get(url)
+    assert 'news_comment' not in ' '.join(
+        query['sql'] for query in context.captured_queries
+    )
+    assert list(first_response.context['comments']) == list(
+        second_response.context['comments']
+    )
+    metrics = admin_client.get(reverse(NEWS_METRICS_URL)).content.decode()
+    assert 'news_comments_cache_hits_total 1' in metrics
+    assert 'news_comments_cache_misses_total 1' in metrics
+
+
+def test_cached_comments_links_depend_on_user(
+    author_client, admin_client, comment
+):
+    url = reverse(NEWS_DETAIL_URL, args=(comment.news_id,))
+    edit_url = reverse(NEWS_EDIT_URL, args=(comment.id,))
+    assert edit_url in author_client.get(url).content.decode()
+    assert edit_url not in admin_client.get(url).content.decode()
+
+
+@pytest.mark.usefixtures('all_comment')
+def test_comment_rows_link_only_own_comments(
+    admin_client, admin_user, comment
+):
+    Comment.objects.filter(pk=comment.pk).update(author=admin_user)
+    url = reverse(NEWS_DETAIL_URL, args=(comment.news_id,))
+    rows = admin_client.get(url).context['comment_rows']
+    assert [row['edit_url'] for row in rows if row['edit_url']] == [
+        reverse(NEWS_EDIT_URL, args=(comment.id,))
+    ]
+    assert [row['delete_url'] for row in rows if row['delete_url']] == [
+        reverse(NEWS_DELETE_URL, args=(comment.id,))
+    ]
+
+
+@pytest.mark.django_db
+def test_news_search(client, news):
+    other = News.objects.create(title='Погода', text='Заголовок завтра')
+    url = reverse(NEWS_SEARCH_URL)
+    response = client.get(url, {'q': 'заголов'})
+    assert list(response.context['object_list']) == [news, other]
+    news.title = 'Спорт'
+    news.save()
+    response = client.get(url, {'q': 'заголовок'})
+    assert list(response.context['object_list']) == [other]
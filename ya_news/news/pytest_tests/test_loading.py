@@ -0,0 +1,127 @@
+import io
+import json
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from news.loading import FixtureError, iter_objects, load_fixture
+from news.models import Comment, News
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'fixtures' / 'news.json'
+
+
+def fixture(*objects):
+    return io.StringIO(json.dumps(objects, ensure_ascii=False))
+
+
+def comment_record(pk, news, author, text='Текст'):
+    return {
+        'model': 'news.comment',
+        'pk': pk,
+        'fields': {
+            'news': news,
+            'author': author,
+            'text': text,
+            'created': '2024-05-01T12:00:00Z',
+        },
+    }
+
+
+def index_names():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' "
+            "AND tbl_name IN ('news_news', 'news_comment')"
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.parametrize(
+    'text, objects',
+    (
+        ('[]', []),
+        (' [ 1 , {"a": [2, 3]} ] ', [1, {'a': [2, 3]}]),
+    ),
+)
+def test_iter_objects_reads_small_chunks(text, objects):
+    assert list(iter_objects(io.StringIO(text), read_size=1)) == objects
+
+
+@pytest.mark.parametrize('text', ('{}', '[1,]', '[1 2]', '[1'))
+def test_iter_objects_rejects_invalid_json(text):
+    with pytest.raises(FixtureError):
+        list(iter_objects(io.StringIO(text), read_size=1))
+
+
+@pytest.mark.django_db
+def test_command_loads_news_fixture():
+    stdout = StringIO()
+    call_command('load_news_fixture', str(FIXTURE), stdout=stdout)
+    titles = [item['fields']['title'] for item in json.loads(
+        FIXTURE.read_text(encoding='utf-8')
+    )]
+    assert sorted(News.objects.values_list('title', flat=True)) == sorted(
+        titles
+    )
+    assert stdout.getvalue() == (
+        f'Загружено новостей: {len(titles)}, комментариев: 0\n'
+    )
+
+
+@pytest.mark.django_db
+def test_comments_are_counted_and_indexes_restored(author, news):
+    indexes = index_names()
+    counts = load_fixture(fixture(
+        *(comment_record(pk, news.pk, author.pk) for pk in range(1, 8))
+    ), batch_size=3)
+    assert counts == {News: 0, Comment: 7}
+    news.refresh_from_db()
+    assert news.comments_count == 7
+    assert index_names() == indexes
+
+
+@pytest.mark.django_db
+def test_news_only_fixture_keeps_comment_counts(comment):
+    load_fixture(fixture(
+        {'model': 'news.news', 'pk': comment.news_id,
+         'fields': {'title': 'Новый', 'text': 'Текст', 'date': '2024-05-01',
+                    'comments_count': 0}},
+        {'model': 'news.news', 'pk': comment.news_id + 1,
+         'fields': {'title': 'Другой', 'text': 'Текст', 'date': '2024-05-01',
+                    'comments_count': 5}},
+    ))
+    assert dict(News.objects.values_list('pk', 'comments_count')) == {
+        comment.news_id: 1, comment.news_id + 1: 0,
+    }
+
+
+@pytest.mark.django_db
+def test_existing_rows_are_replaced(author, comment):
+    load_fixture(fixture(
+        {'model': 'news.news', 'pk': comment.news_id,
+         'fields': {'title': 'Новый', 'text': 'Текст', 'date': '2024-05-01'}},
+        comment_record(comment.pk, comment.news_id, author.pk, 'Новый'),
+    ))
+    comment.refresh_from_db()
+    assert comment.text == comment.news.title == 'Новый'
+    assert News.objects.count() == Comment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_invalid_fixture_loads_nothing(author, news, tmp_path):
+    indexes = index_names()
+    path = tmp_path / 'broken.json'
+    path.write_text('[{"model": "news.news", "fields": {}},')
+    with pytest.raises(CommandError):
+        call_command('load_news_fixture', str(path))
+    stream = fixture(
+        comment_record(1, news.pk, author.pk),
+        {'model': 'news.news', 'fields': {'date': 'вчера'}},
+    )
+    with pytest.raises(FixtureError):
+        load_fixture(stream, batch_size=1)
+    assert not Comment.objects.exists()
+    assert index_names() == indexes
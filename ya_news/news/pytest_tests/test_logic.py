@@ -1,12 +1,15 @@
 from http import HTTPStatus
+from io import StringIO
 from random import choice
 
 import pytest
+from django.core.management import call_command
 from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, WARNING, CommentForm
+from news.matching import AhoCorasick
+from news.models import Comment, News
 
 NEWS_DELETE_URL = 'news:delete'
 NEWS_DETAIL_URL = 'news:detail'
@@ -14,6 +17,8 @@ NEWS_EDIT_URL = 'news:edit'
 NEWS_HOME_URL = 'news:home'
 COMMENT_TEXT = 'Новый текст комментария'
 
+pytestmark = pytest.mark.usefixtures('shared_data')
+
 
 @pytest.mark.django_db
 def test_anonymous_user_cant_create_comment(client, news):
@@ -31,7 +36,7 @@ def test_user_can_create_comment(author_client, author, news):
     assertRedirects(response, f'{url}#comments')
     comments_count_after = Comment.objects.count()
     assert comments_count_after == comments_count_before + 1
-    comment = Comment.objects.get()
+    comment = Comment.objects.get(text=COMMENT_TEXT)
     assert comment.text == COMMENT_TEXT
     assert comment.news == news
     assert comment.author == author
@@ -98,3 +103,66 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment.text != COMMENT_TEXT
     assert comment.news == news
     assert comment.author == author
+
+
+def test_comments_count_follows_create_and_delete(author_client, news):
+    comments_count_before = news.comments_count
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    news.refresh_from_db()
+    assert news.comments_count == comments_count_before + 1
+    comment = Comment.objects.get(text=COMMENT_TEXT)
+    author_client.delete(reverse(NEWS_DELETE_URL, args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comments_count == comments_count_before
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('all_comment')
+def test_recount_comments_command(news):
+    News.objects.update(comments_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comments_count == Comment.objects.filter(news=news).count()
+
+
+def test_comment_edit_invalidates_cached_block(author_client, comment):
+    detail_url = reverse(NEWS_DETAIL_URL, args=(comment.news_id,))
+    author_client.get(detail_url)
+    url = reverse(NEWS_EDIT_URL, args=(comment.id,))
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    assert COMMENT_TEXT in author_client.get(detail_url).content.decode()
+
+
+def test_comment_delete_invalidates_cached_block(author_client, comment):
+    detail_url = reverse(NEWS_DETAIL_URL, args=(comment.news_id,))
+    author_client.get(detail_url)
+    url = reverse(NEWS_DELETE_URL, args=(comment.id,))
+    author_client.delete(url)
+    assert url not in author_client.get(detail_url).content.decode()
+
+
+def test_new_comment_invalidates_cached_block(author_client, news):
+    detail_url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    author_client.get(detail_url)
+    author_client.post(detail_url, data={'text': COMMENT_TEXT})
+    assert COMMENT_TEXT in author_client.get(detail_url).content.decode()
+
+
+def test_matcher_reports_all_positions():
+    matcher = AhoCorasick(('he', 'she', 'his', 'hers'))
+    assert sorted(matcher.finditer('ushers')) == [
+        (1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')
+    ]
+    assert matcher.search('nothing') is None
+
+
+def test_bad_words_file_is_reloaded(settings, tmp_path):
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# словарь\nбяка\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = words_file
+    assert not CommentForm(data={'text': 'Ну ты и бяка'}).is_valid()
+    assert CommentForm(data={'text': 'Ну ты и бука'}).is_valid()
+    words_file.write_text('бука\n', encoding='utf-8')
+    assert not CommentForm(data={'text': 'Ну ты и БУКА'}).is_valid()
+    assert CommentForm(data={'text': 'Ну ты и бяка'}).is_valid()
@@ -0,0 +1,34 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from yacommon import profiling
+
+CPU_PROFILE_URL = 'cpu_profile'
+NEWS_DETAIL_URL = 'news:detail'
+PROFILING_URL = 'profiling'
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def profiled(settings):
+    settings.PROFILING_SAMPLE_RATE = 1
+    profiling.reset()
+    yield
+    profiling.reset()
+
+
+def test_profiling_is_wired(admin_client, news):
+    """Сам профилировщик проверяется в yacommon/tests."""
+    admin_client.get(reverse(NEWS_DETAIL_URL, args=(news.id,)))
+    response = admin_client.get(reverse(PROFILING_URL))
+    assert NEWS_DETAIL_URL in response.json()['views']
+    response = admin_client.get(reverse(CPU_PROFILE_URL))
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_profiling_reports_are_hidden(client):
+    for name in (PROFILING_URL, CPU_PROFILE_URL):
+        assert client.get(reverse(name)).status_code == HTTPStatus.NOT_FOUND
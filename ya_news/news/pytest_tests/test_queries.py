@@ -0,0 +1,77 @@
+import pytest
+from django.urls import reverse
+
+NEWS_DELETE_URL = 'news:delete'
+NEWS_DETAIL_URL = 'news:detail'
+NEWS_EDIT_URL = 'news:edit'
+COMMENT_TEXT = 'Текст комментария'
+
+# Сессия и пользователь.
+AUTH_QUERIES = 2
+# В тестах транзакция открыта заранее, поэтому atomic() добавляет
+# SAVEPOINT и RELEASE SAVEPOINT.
+SAVEPOINT_QUERIES = 2
+
+
+@pytest.mark.django_db
+def test_comment_post_queries(author_client, news, django_assert_num_queries):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    # Новость, INSERT комментария и UPDATE счётчика.
+    with django_assert_num_queries(AUTH_QUERIES + SAVEPOINT_QUERIES + 3):
+        author_client.post(url, data={'text': COMMENT_TEXT})
+
+
+@pytest.mark.django_db
+def test_detail_get_queries(admin_client, news, django_assert_num_queries):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    # Новость и страница комментариев, которая затем берётся из кеша.
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        admin_client.get(url)
+    with django_assert_num_queries(AUTH_QUERIES + 1):
+        admin_client.get(url)
+
+
+@pytest.mark.django_db
+def test_anonymous_detail_get_queries(
+    client, news, django_assert_num_queries
+):
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    # Проверка версии страницы, новость и комментарии.
+    with django_assert_num_queries(3):
+        client.get(url)
+    # Дальше страница целиком берётся из кеша.
+    with django_assert_num_queries(1):
+        client.get(url)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, method, queries',
+    (
+        # Только выборка комментария вместе с новостью.
+        (NEWS_EDIT_URL, 'get', 1),
+        (NEWS_DELETE_URL, 'get', 1),
+        # Выборка и UPDATE комментария.
+        (NEWS_EDIT_URL, 'post', 2),
+        # Выборка, DELETE и UPDATE счётчика в транзакции.
+        (NEWS_DELETE_URL, 'post', SAVEPOINT_QUERIES + 3),
+    )
+)
+def test_author_comment_queries(
+    author_client, comment, name, method, queries, django_assert_num_queries
+):
+    url = reverse(name, args=(comment.id,))
+    with django_assert_num_queries(AUTH_QUERIES + queries):
+        getattr(author_client, method)(url, data={'text': COMMENT_TEXT})
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', (NEWS_EDIT_URL, NEWS_DELETE_URL))
+@pytest.mark.parametrize('method', ('get', 'post'))
+def test_not_author_comment_queries(
+    admin_client, comment, name, method, django_assert_num_queries
+):
+    url = reverse(name, args=(comment.id,))
+    # Выборка чужого комментария ничего не находит, дальше только 404.
+    with django_assert_num_queries(AUTH_QUERIES + 1):
+        getattr(admin_client, method)(url, data={'text': COMMENT_TEXT})
@@ -0,0 +1,140 @@
+import sqlite3
+import time
+
+import pytest
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from news.cache import read_source
+from news.models import Comment, News
+from yacommon.replicas import reading_from
+from yanews.routers import (
+    PIN_COOKIE, ReplicaRouter, read_from_replicas
+)
+
+NEWS_DETAIL_URL = 'news:detail'
+NEWS_HOME_URL = 'news:home'
+NEWS_SEARCH_URL = 'news:search'
+ADMIN_CHANGELIST_URL = 'admin:news_news_changelist'
+REPLICA = 'replica'
+FRESH_TITLE = 'Свежий заголовок'
+COMMENT_TEXT = 'Текст комментария'
+
+
+@pytest.fixture
+def make_replica(settings, tmp_path):
+    """Копирует текущее состояние базы в файл и подключает его репликой."""
+    def make():
+        path = tmp_path / 'replica.sqlite3'
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        connections.settings[REPLICA] = {
+            **connection.settings_dict, 'NAME': str(path),
+        }
+        settings.DATABASE_REPLICAS = [REPLICA]
+        return REPLICA
+
+    yield make
+    if REPLICA in connections.settings:
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+
+def test_router_reads_from_replica_only_inside_block(settings):
+    settings.DATABASE_REPLICAS = [REPLICA]
+    router = ReplicaRouter()
+    assert router.db_for_read(News) is None
+    with read_from_replicas():
+        assert router.db_for_read(News) == REPLICA
+        assert router.db_for_write(News) == 'default'
+    assert router.allow_migrate(REPLICA, 'news') is False
+    assert router.allow_migrate('default', 'news') is None
+
+
+def test_replica_cache_source_expires(settings, monkeypatch):
+    settings.REPLICA_PIN_SECONDS = 10
+    monkeypatch.setattr(time, 'time', lambda: 105.0)
+    assert read_source() == 'default'
+    with reading_from(REPLICA):
+        source = read_source()
+        monkeypatch.setattr(time, 'time', lambda: 115.0)
+        assert read_source() != source
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('name', (NEWS_HOME_URL, NEWS_DETAIL_URL))
+def test_pages_read_from_replica(make_replica, admin_client, news, name):
+    make_replica()
+    News.objects.filter(pk=news.pk).update(title=FRESH_TITLE)
+    url = reverse(name, args=(news.id,) if name == NEWS_DETAIL_URL else None)
+    content = admin_client.get(url).content.decode()
+    assert news.title in content
+    assert FRESH_TITLE not in content
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('name', (NEWS_HOME_URL, NEWS_DETAIL_URL))
+def test_anonymous_pages_read_from_replica(make_replica, news, name):
+    make_replica()
+    News.objects.filter(pk=news.pk).update(title=FRESH_TITLE)
+    url = reverse(name, args=(news.id,) if name == NEWS_DETAIL_URL else None)
+    content = Client().get(url).content.decode()
+    assert news.title in content
+    assert FRESH_TITLE not in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_lagging_replica_does_not_fill_primary_cache(
+        make_replica, admin_client, author_client, news
+):
+    make_replica()
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    # Читатели без закрепления первыми заполняют кеш по отставшей реплике.
+    assert COMMENT_TEXT not in admin_client.get(url).content.decode()
+    stale = Client().get(url)
+    assert COMMENT_TEXT not in stale.content.decode()
+    assert COMMENT_TEXT in author_client.get(url).content.decode()
+    pinned = Client()
+    pinned.cookies[PIN_COOKIE] = '1'
+    fresh = pinned.get(url)
+    assert COMMENT_TEXT in fresh.content.decode()
+    assert fresh['ETag'] != stale['ETag']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_admin_changelist_reads_from_replica(make_replica, admin_client, news):
+    make_replica()
+    News.objects.filter(pk=news.pk).update(title=FRESH_TITLE)
+    content = admin_client.get(reverse(ADMIN_CHANGELIST_URL)).content
+    assert FRESH_TITLE not in content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_is_pinned_to_primary(make_replica, author_client, news):
+    make_replica()
+    url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    author_client.post(url, data={'text': COMMENT_TEXT})
+    assert Comment.objects.filter(text=COMMENT_TEXT).exists()
+    assert COMMENT_TEXT in author_client.get(url).content.decode()
+    assert PIN_COOKIE in author_client.cookies
+    # Когда закрепление истекло, пользователь снова читает с реплики.
+    News.objects.filter(pk=news.pk).update(title=FRESH_TITLE)
+    del author_client.cookies[PIN_COOKIE]
+    content = author_client.get(url).content.decode()
+    assert FRESH_TITLE not in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_reads_from_replica(make_replica, news):
+    make_replica()
+    News.objects.filter(pk=news.pk).delete()
+    response = Client().get(
+        reverse(NEWS_SEARCH_URL), {'q': news.title.split()[0]}
+    )
+    detail_url = reverse(NEWS_DETAIL_URL, args=(news.id,))
+    assert f'href="{detail_url}"' in response.content.decode()
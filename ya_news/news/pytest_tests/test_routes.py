@@ -6,20 +6,27 @@ from pytest_django.asserts import assertRedirects
 
 ADMIN_CLIENT = pytest.lazy_fixture('admin_client')
 AUTHOR_CLIENT = pytest.lazy_fixture('author_client')
+NEWS_ARCHIVE_URL = 'news:archive'
 NEWS_DELETE_URL = 'news:delete'
 NEWS_DETAIL_URL = 'news:detail'
 NEWS_EDIT_URL = 'news:edit'
 NEWS_HOME_URL = 'news:home'
+NEWS_METRICS_URL = 'news:comments_cache_metrics'
+NEWS_SEARCH_URL = 'news:search'
 USERS_LOGIN_URL = 'users:login'
 USERS_LOGOUT_URL = 'users:logout'
 USERS_SIGNUP_URL = 'users:signup'
 
+pytestmark = pytest.mark.usefixtures('shared_data')
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'name, note_object',
     (
         (NEWS_HOME_URL, None),
+        (NEWS_ARCHIVE_URL, None),
+        (NEWS_SEARCH_URL, None),
         (NEWS_DETAIL_URL, pytest.lazy_fixture('news')),
         (USERS_LOGIN_URL, None),
         (USERS_LOGOUT_URL, None),
@@ -63,3 +70,17 @@ def test_redirects(client, name, comment):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (pytest.lazy_fixture('client'), HTTPStatus.NOT_FOUND),
+        (AUTHOR_CLIENT, HTTPStatus.NOT_FOUND),
+        (ADMIN_CLIENT, HTTPStatus.OK),
+    ),
+)
+def test_metrics_availability(parametrized_client, expected_status):
+    response = parametrized_client.get(reverse(NEWS_METRICS_URL))
+    assert response.status_code == expected_status
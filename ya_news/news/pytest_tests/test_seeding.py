@@ -0,0 +1,71 @@
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from news.models import Comment, News
+from news.seeding import seed_news
+
+NOW = timezone.make_aware(datetime(2024, 5, 1, 12))
+
+
+def snapshot():
+    return (
+        list(News.objects.order_by('pk').values_list()),
+        list(Comment.objects.order_by('pk').values_list()),
+    )
+
+
+@pytest.mark.django_db
+def test_same_seed_gives_same_rows(django_user_model):
+    seed_news(30, 300, 5, seed=7, now=NOW)
+    first = snapshot()
+    for model in (Comment, News, django_user_model):
+        model.objects.all().delete()
+    seed_news(30, 300, 5, seed=7, now=NOW)
+    assert snapshot() == first
+    Comment.objects.all().delete()
+    News.objects.all().delete()
+    seed_news(30, 300, 0, seed=8, now=NOW)
+    assert snapshot() != first
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'seed_volumes', ({'news': 50, 'comments': 1_000, 'users': 10},)
+)
+def test_seeded_news_is_consistent(seeded_news, seed_volumes):
+    assert News.objects.count() == len(seeded_news.news) == 50
+    assert Comment.objects.count() == len(seeded_news.comments) == 1_000
+    assert not News.objects.annotate(
+        actual=Count('comment')
+    ).exclude(comments_count=F('actual')).exists()
+    # Комментарии появляются не раньше новости.
+    for news in News.objects.annotate(first=Min('comment__created')):
+        assert news.first is None or (
+            timezone.localtime(news.first).date() >= news.date
+        )
+
+
+@pytest.mark.django_db
+def test_seed_keeps_autoincrement(seeded_news, author):
+    comment = Comment.objects.create(
+        news_id=seeded_news.news[0], author=author, text='Текст'
+    )
+    assert comment.pk == seeded_news.comments[-1] + 1
+
+
+@pytest.mark.django_db
+def test_seed_news_command():
+    stdout = StringIO()
+    call_command(
+        'seed_news', '--users=2', '--news=3', '--comments=10',
+        '--now=2024-05-01T12:00', stdout=stdout,
+    )
+    assert stdout.getvalue() == (
+        'Создано пользователей: 2, новостей: 3, комментариев: 10\n'
+    )
+    assert News.objects.filter(date=NOW.date()).count() == 3
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from yacommon.seeding import (
+    BATCH_SIZE, bulk_create, phrase, pk_range, seeding
+)
+
+from .models import Comment, News
+
+NEWS_PER_DAY = 10
+# Среднее время между комментариями к одной новости.
+COMMENT_INTERVAL = timedelta(minutes=30)
+WORDS = (
+    'погода', 'спорт', 'политика', 'экономика', 'город', 'выборы', 'рынок',
+    'школа', 'театр', 'футбол', 'дожди', 'мост', 'метро', 'цены', 'наука',
+    'выставка', 'концерт', 'парк', 'дорога', 'бюджет', 'врачи', 'полёт',
+    'открытие', 'ремонт', 'урожай', 'фестиваль', 'музей', 'снег', 'порт',
+    'рекорд',
+)
+
+Seeded = namedtuple('Seeded', ('users', 'news', 'comments'))
+
+
+def seed_news(news, comments, users, seed=0, now=None,
+              batch_size=BATCH_SIZE):
+    """
+    Создаёт пользователей, новости и комментарии к ним.
+
+    При одинаковых `seed` и `now` на той же базе получаются те же строки.
+    Ключи назначаются явно, а число комментариев каждой новости известно
+    заранее, поэтому не нужны ни повторные выборки, ни UPDATE после
+    вставки.
+    """
+    with seeding((News, Comment), users, seed, now, batch_size) as seeded:
+        rng = seeded.rng
+        today = timezone.localdate(seeded.now)
+        if comments and not (news and seeded.author_ids):
+            raise ValueError('Для комментариев нужны новости и пользователи.')
+        counts = [0] * news
+        for _ in range(comments):
+            counts[rng.randrange(news)] += 1
+        news_pks = pk_range(News, news)
+        dates = [
+            today - timedelta(days=index // NEWS_PER_DAY)
+            for index in range(news)
+        ]
+        bulk_create(News, (
+            News(
+                pk=pk,
+                title=phrase(rng, WORDS, 3).capitalize()[:50],
+                text=phrase(rng, WORDS, 30).capitalize() + '.',
+                date=date,
+                comments_count=count,
+            )
+            for pk, date, count in zip(news_pks, dates, counts)
+        ), batch_size)
+        comment_pks = pk_range(Comment, comments)
+        bulk_create(Comment, _comments(
+            rng, iter(comment_pks), news_pks, dates, counts,
+            seeded.author_ids,
+        ), batch_size)
+    return Seeded(seeded.user_pks, news_pks, comment_pks)
+
+
+def _comments(rng, pks, news_pks, dates, counts, author_ids):
+    interval = int(COMMENT_INTERVAL.total_seconds())
+    for news_pk, date, count in zip(news_pks, dates, counts):
+        created = timezone.make_aware(datetime.combine(date, time.min))
+        for _ in range(count):
+            created += timedelta(seconds=rng.randint(1, 2 * interval))
+            yield Comment(
+                pk=next(pks),
+                news_id=news_pk,
+                author_id=rng.choice(author_ids),
+                text=phrase(
+                    rng, WORDS, rng.randint(3, 15)
+                ).capitalize() + '.',
+                created=created,
+            )
@@ -1,13 +1,33 @@
+from functools import update_wrapper
+
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import AccessMixin, LoginRequiredMixin
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
 
+from yacommon.search import search
+from yacommon.views import StaffOnlyMixin
+
+from .cache import (
+    anonymous_http_cache,
+    bump_comments_version,
+    get_cache_stats,
+    get_comments_page,
+    news_detail_state,
+    news_list_state,
+)
+from .executor import run_in_executor
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import KeysetPaginator
 
 
+@method_decorator(anonymous_http_cache(news_list_state), name='dispatch')
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
@@ -19,63 +39,163 @@ class NewsList(generic.ListView):
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.for_list()[
+            :settings.NEWS_COUNT_ON_HOME_PAGE
+        ]
 
 
-class NewsDetail(generic.DetailView):
+class NewsArchive(generic.ListView):
+    """Архив всех новостей с постраничным выводом по курсору."""
     model = News
-    template_name = 'news/detail.html'
+    template_name = 'news/archive.html'
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get_queryset(self):
+        paginator = KeysetPaginator(
+            self.model.objects.for_list(),
+            ('-date', '-pk'),
+            settings.NEWS_COUNT_ON_ARCHIVE_PAGE,
         )
-        return obj
+        self.page = paginator.get_page(self.request.GET.get('cursor'))
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = self.page
+        return context
+
+
+class NewsSearch(generic.ListView):
+    """Полнотекстовый поиск по новостям."""
+    model = News
+    template_name = 'news/search.html'
+
+    def get_paginate_by(self, queryset):
+        return settings.NEWS_SEARCH_PAGE_SIZE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search(self.model.objects.for_list(), self.query)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+        context['query'] = self.query
         return context
 
 
-class NewsComment(
-        LoginRequiredMixin,
-        generic.detail.SingleObjectMixin,
-        generic.FormView
+class NewsCommentsMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = get_comments_page(
+            self.object, self.request.GET.get('cursor')
+        )
+        context['comment_rows'] = self.get_comment_rows(context['comments'])
+        return context
+
+    def get_comment_rows(self, page):
+        """
+        Строки для шаблона: готовый HTML и ссылки у своих комментариев.
+
+        Автор сравнивается здесь по id пользователя, взятому один раз.
+        Шаблон читает только ключи словарей, без обращений к атрибутам
+        пользователя и комментария в цикле.
+        """
+        user_id = self.request.user.pk
+        rows = []
+        for comment in page.object_list:
+            # Ключи есть у всех строк: промах по ключу шаблон обрабатывает
+            # долго, перебирая атрибуты объекта.
+            row = {'html': comment.html, 'edit_url': '', 'delete_url': ''}
+            if comment.author_id == user_id:
+                row['edit_url'] = reverse('news:edit', args=(comment.pk,))
+                row['delete_url'] = reverse(
+                    'news:delete', args=(comment.pk,)
+                )
+            rows.append(row)
+        return rows
+
+
+@method_decorator(anonymous_http_cache(news_detail_state), name='dispatch')
+class NewsDetailView(
+        AccessMixin,
+        NewsCommentsMixin,
+        generic.edit.FormMixin,
+        generic.DetailView
 ):
+    """
+    Новость с комментариями и добавление комментария к ней.
+
+    GET и POST обрабатываются одним представлением: новость загружается
+    один раз, а адрес перехода после комментария строится без запроса.
+    """
     model = News
     form_class = CommentForm
     template_name = 'news/detail.html'
 
+    def get_object(self, queryset=None):
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if not self.request.user.is_authenticated:
+            del context['form']
+        return context
+
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
         self.object = self.get_object()
-        return super().post(request, *args, **kwargs)
+        form = self.get_form()
+        if form.is_valid():
+            return self.form_valid(form)
+        return self.form_invalid(form)
 
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
+            News.objects.filter(pk=self.object.pk).update(
+                comments_count=F('comments_count') + 1
+            )
+        bump_comments_version(self.object.pk)
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
-class NewsDetailView(generic.View):
+class AsyncViewMixin:
+    """
+    Асинхронный вариант синхронного представления для ASGI.
 
-    def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+    В Django 3.2 нет асинхронного ORM, поэтому dispatch целиком
+    выполняется в ограниченном пуле потоков, а цикл событий тем временем
+    обслуживает другие соединения. Шаблоны и контекст те же, что у
+    синхронного представления.
+    """
 
-    def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await run_in_executor(view, request, *args, **kwargs)
+
+        update_wrapper(async_view, view)
+        return async_view
+
+
+class AsyncNewsList(AsyncViewMixin, NewsList):
+    """Список новостей для ASGI."""
+
+
+class AsyncNewsDetailView(AsyncViewMixin, NewsDetailView):
+    """Новость с комментариями для ASGI."""
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +203,16 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Новость берём из уже загруженного комментария, без запросов."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -98,7 +220,42 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        bump_comments_version(self.object.news_id)
+        return response
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        """Удаляем комментарий и уменьшаем счётчик у новости."""
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        with transaction.atomic():
+            deleted, _ = self.object.delete()
+            if deleted:
+                News.objects.filter(
+                    pk=self.object.news_id, comments_count__gt=0
+                ).update(
+                    comments_count=F('comments_count') - 1
+                )
+        bump_comments_version(self.object.news_id)
+        return HttpResponseRedirect(success_url)
+
+
+class CommentsCacheMetrics(StaffOnlyMixin, generic.View):
+    """Счётчики кеша комментариев в текстовом формате Prometheus."""
+
+    def get(self, request, *args, **kwargs):
+        stats = get_cache_stats()
+        lines = [
+            f'news_comments_cache_{name}_total {value}'
+            for name, value in stats.items()
+        ]
+        return HttpResponse(
+            '\n'.join(lines) + '\n',
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
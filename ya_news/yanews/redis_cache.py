@@ -0,0 +1,215 @@
+import pickle
+import socket
+import threading
+from urllib.parse import urlsplit
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class RedisError(Exception):
+    """Сервер ответил ошибкой RESP."""
+
+
+class RedisConnection:
+    """Одно соединение с сервером по протоколу RESP."""
+
+    def __init__(self, host, port, db, timeout):
+        self.address = (host, port)
+        self.db = db
+        self.timeout = timeout
+        self.sock = None
+        self.file = None
+
+    def connect(self):
+        self.sock = socket.create_connection(self.address, self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile('rb')
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def close(self):
+        if self.sock is not None:
+            self.file.close()
+            self.sock.close()
+        self.sock = self.file = None
+
+    def execute(self, *args, idempotent=True):
+        """
+        Выполняет команду, один раз переподключаясь при обрыве.
+
+        Если команда уже отправлена, а ответа нет, сервер мог её
+        выполнить, поэтому повторяется только идемпотентная команда.
+        """
+        for attempt in range(2):
+            if self.sock is None:
+                self.connect()
+            sent = False
+            try:
+                self._send(*args)
+                sent = True
+                return self._read()
+            except (ConnectionError, socket.timeout, EOFError):
+                self.close()
+                if attempt or (sent and not idempotent):
+                    raise
+
+    def _call(self, *args):
+        self._send(*args)
+        return self._read()
+
+    def _send(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self.sock.sendall(b''.join(parts))
+
+    def _read(self):
+        line = self.file.readline()
+        if not line.endswith(b'\r\n'):
+            raise EOFError('Соединение с сервером кеша закрыто.')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            raise RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self.file.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read() for _ in range(length)]
+        raise RedisError(f'Неизвестный ответ сервера: {line!r}')
+
+
+class RedisCache(BaseCache):
+    """
+    Кеш Django поверх Redis или совместимого сервера без сторонних пакетов.
+
+    LOCATION задаётся как redis://host:port/db. Целые числа хранятся
+    как есть, чтобы incr выполнялся на сервере командой INCRBY,
+    остальные значения сериализуются pickle. Соединение своё у каждого
+    потока и живёт между запросами.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        url = urlsplit(server if '://' in server else f'redis://{server}')
+        self._params = (
+            url.hostname or '127.0.0.1',
+            url.port or 6379,
+            int(url.path.strip('/') or 0),
+            params.get('OPTIONS', {}).get('SOCKET_TIMEOUT', 1.0),
+        )
+        self._local = threading.local()
+
+    @property
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = RedisConnection(
+                *self._params
+            )
+        return connection
+
+    def _execute(self, *args, idempotent=True):
+        return self._connection.execute(*args, idempotent=idempotent)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _expiry(self, timeout):
+        """Срок жизни в миллисекундах; None — бессрочно."""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return None if timeout is None else int(timeout * 1000)
+
+    @staticmethod
+    def _dumps(value):
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _loads(data):
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def _set(self, key, value, timeout, *flags):
+        expiry = self._expiry(timeout)
+        if expiry is not None and expiry <= 0:
+            # Как и в остальных бэкендах, нулевой срок удаляет значение.
+            if flags:
+                return False
+            self._execute('DEL', key)
+            return True
+        args = ['SET', key, self._dumps(value), *flags]
+        if expiry is not None:
+            args += ['PX', expiry]
+        # Повторный SET NX ответил бы, что ключ уже есть.
+        return self._execute(*args, idempotent=not flags) == 'OK'
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._set(self._key(key, version), value, timeout, 'NX')
+
+    def get(self, key, default=None, version=None):
+        data = self._execute('GET', self._key(key, version))
+        return default if data is None else self._loads(data)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._set(self._key(key, version), value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        expiry = self._expiry(timeout)
+        if expiry is None:
+            return bool(
+                self._execute('PERSIST', key) or self._execute('EXISTS', key)
+            )
+        return bool(self._execute('PEXPIRE', key, expiry))
+
+    def delete(self, key, version=None):
+        return bool(self._execute('DEL', self._key(key, version)))
+
+    def has_key(self, key, version=None):
+        return bool(self._execute('EXISTS', self._key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        if not self._execute('EXISTS', key):
+            raise ValueError(f"Key '{key}' not found")
+        # Оборванное соединение замечает EXISTS, а повтор INCRBY мог бы
+        # увеличить счётчик дважды.
+        return self._execute('INCRBY', key, delta, idempotent=False)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self._execute(
+            'MGET', *(self._key(key, version) for key in keys)
+        )
+        return {
+            key: self._loads(data)
+            for key, data in zip(keys, values) if data is not None
+        }
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        if keys:
+            self._execute('DEL', *keys)
+
+    def clear(self):
+        self._execute('FLUSHDB')
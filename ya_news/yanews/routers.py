@@ -0,0 +1,88 @@
+import random
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from yacommon.replicas import (
+    is_reading_from_replica, read_database, reading_from, set_read_database
+)
+
+PIN_COOKIE = 'replica_pin'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def choose_replica():
+    """Случайная реплика или None, если реплик нет."""
+    if settings.DATABASE_REPLICAS:
+        return random.choice(settings.DATABASE_REPLICAS)
+    return None
+
+
+def read_from_replicas():
+    """Направляет чтения внутри блока на одну случайную реплику."""
+    return reading_from(choose_replica())
+
+
+class ReplicaRouter:
+    """
+    Чтения идут на реплику, выбранную для запроса или блока
+    read_from_replicas(): все запросы одного ответа видят одни данные.
+
+    Все записи и остальные чтения выполняются на основной базе. Реплики
+    — копии основной базы, поэтому миграции к ним не применяются.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_reading_from_replica():
+            return read_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware(MiddlewareMixin):
+    """
+    Включает чтение с реплики для представлений из REPLICA_READ_VIEWS.
+
+    Реплика выбирается одна на запрос, чтобы ETag и страница строились
+    по одним и тем же данным.
+
+    После успешного изменяющего запроса клиент получает cookie на
+    REPLICA_PIN_SECONDS и всё это время читает с основной базы, чтобы
+    сразу видеть свои изменения, даже если реплики отстают. Cookie, а не
+    сессия, — чтобы закрепление не стоило записи в базу.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and self.is_replica_view(request)
+                and PIN_COOKIE not in request.COOKIES):
+            set_read_database(choose_replica())
+
+    def process_response(self, request, response):
+        set_read_database(None)
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
+
+    def is_replica_view(self, request):
+        view_name = request.resolver_match.view_name
+        return any(
+            fnmatchcase(view_name, pattern)
+            for pattern in settings.REPLICA_READ_VIEWS
+        )
@@ -1,12 +1,24 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
+from yacommon.settings import (  # noqa: F401
+    CPU_PROFILING_HEADER,
+    CPU_PROFILING_IDLE_SECONDS,
+    CPU_PROFILING_INTERVAL,
+    LOGGING,
+    PROFILING_DUPLICATE_THRESHOLD,
+    PROFILING_LOG_INTERVAL,
+    PROFILING_MIDDLEWARE,
+)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
-DEBUG = True
+# В продакшене запускается с YANEWS_DEBUG=0.
+DEBUG = os.environ.get('YANEWS_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
@@ -21,22 +33,28 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    *PROFILING_MIDDLEWARE,
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yanews.routers.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yanews.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -44,6 +62,11 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Без DEBUG шаблоны компилируются один раз на процесс,
+            # при разработке перечитываются с диска при каждом рендеринге.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
@@ -53,9 +76,66 @@ WSGI_APPLICATION = 'yanews.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite с WAL и прагмами для одновременной работы, см. yacommon.sqlite.
+        'ENGINE': 'yacommon.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами, и прагмы
+        # не выполняются заново на каждый запрос.
+        'CONN_MAX_AGE': 60,
+        # Тестовая база в памяти, своя у каждого процесса pytest-xdist.
+        # Без явного имени pytest-django не узнаёт SQLite в своём движке
+        # и строит для процессов несуществующий путь test_<NAME>_gw0.
+        'TEST': {
+            'NAME': ':memory:',
+        },
+    }
+}
+
+# Реплики только для чтения: пути к копиям базы через os.pathsep.
+# В тестах реплики зеркалят основную базу.
+for index, path in enumerate(
+    filter(None, os.environ.get('YANEWS_DB_REPLICAS', '').split(os.pathsep)),
+    start=1,
+):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['yanews.routers.ReplicaRouter']
+
+# Представления, которые читают с реплик; шаблоны fnmatch по view_name.
+REPLICA_READ_VIEWS = (
+    'news:home', 'news:detail', 'news:search', 'admin:*_changelist',
+)
+
+# Сколько секунд после записи клиент читает только с основной базы.
+REPLICA_PIN_SECONDS = 10
+
+# Хранилище кеша: locmem, file или redis.
+CACHE_BACKEND = os.environ.get('YANEWS_CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('YANEWS_CACHE_DIR', BASE_DIR / 'cache'),
+    },
+    'redis': {
+        'BACKEND': 'yanews.redis_cache.RedisCache',
+        'LOCATION': os.environ.get(
+            'YANEWS_REDIS_URL', 'redis://127.0.0.1:6379/0'
+        ),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
 }
 
 
@@ -80,3 +160,45 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+# Сколько символов текста новости загружается для анонса в списках:
+# с запасом на 15 слов, которые оставляет truncatewords.
+NEWS_EXCERPT_LENGTH = 300
+
+NEWS_COUNT_ON_ARCHIVE_PAGE = 10
+
+NEWS_SEARCH_PAGE_SIZE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+COMMENTS_CACHE_TIMEOUT = 60 * 60
+
+# Сколько хранится в кеше страница, отданная анонимному пользователю.
+NEWS_PAGE_CACHE_TIMEOUT = 5 * 60
+
+# Сколько записей фикстуры сохраняется одним bulk_create.
+NEWS_FIXTURE_BATCH_SIZE = 5_000
+
+# Асинхронные главная и страница новости; имеет смысл только под ASGI.
+NEWS_ASYNC_VIEWS = os.environ.get('YANEWS_ASYNC_VIEWS') == '1'
+
+# Сколько потоков выполняют асинхронные представления одновременно.
+NEWS_ASYNC_WORKERS = 8
+
+# Файл со списком запрещённых слов, по одному в строке.
+# Если не задан, используется news.forms.BAD_WORDS.
+BAD_WORDS_FILE = None
+
+# Профилирование запросов, см. yacommon.profiling: доля замеряемых
+# запросов от 0 до 1. При 0 middleware отключается.
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YANEWS_PROFILING_SAMPLE_RATE', '0')
+)
+
+# Выборочное профилирование CPU по SIGPROF, см. yacommon.profiling.
+# Остальные настройки профилирования общие, см. yacommon.settings.
+CPU_PROFILING = os.environ.get('YANEWS_CPU_PROFILING') == '1'
+
+# Представления, которые профилируются всегда; шаблоны fnmatch по view_name.
+# Комментарии публикуются POST-запросом к странице новости.
+CPU_PROFILING_VIEWS = ('news:detail',)
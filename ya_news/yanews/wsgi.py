@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from yacommon.profiling import install_cpu_sampler
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
+# До загрузки middleware и в главном потоке, см. yacommon.profiling.
+install_cpu_sampler()
+
 application = get_wsgi_application()
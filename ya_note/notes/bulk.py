@@ -0,0 +1,135 @@
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+
+from .forms import WARNING
+from .models import Note
+from .slugs import SlugConflictError, allocate_slugs
+
+EXPORT_FIELDS = ('title', 'text', 'slug')
+
+
+class NoteImportError(ValueError):
+    """Строка JSON Lines не описывает заметку."""
+
+    def __init__(self, line_number, message):
+        super().__init__(f'Строка {line_number}: {message}')
+        self.line_number = line_number
+
+
+def _check_string(data, field, line_number, required=False):
+    value = data.get(field)
+    if value is None and not required:
+        return
+    if not isinstance(value, str) or (required and not value):
+        raise NoteImportError(
+            line_number, f'поле «{field}» должно быть непустой строкой.'
+        )
+    max_length = Note._meta.get_field(field).max_length
+    if max_length and len(value) > max_length:
+        raise NoteImportError(
+            line_number, f'поле «{field}» длиннее {max_length} символов.'
+        )
+
+
+def parse_notes(lines, author):
+    """Лениво превращает строки JSON Lines в пары (номер строки, заметка)."""
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            raise NoteImportError(line_number, 'некорректный JSON.')
+        if not isinstance(data, dict):
+            raise NoteImportError(line_number, 'ожидается JSON-объект.')
+        _check_string(data, 'text', line_number, required=True)
+        _check_string(data, 'title', line_number)
+        _check_string(data, 'slug', line_number)
+        if data.get('slug'):
+            try:
+                validate_slug(data['slug'])
+            except ValidationError:
+                raise NoteImportError(line_number, 'некорректный slug.')
+        yield line_number, Note(
+            author=author,
+            **{field: data[field] for field in EXPORT_FIELDS if field in data}
+        )
+
+
+def _save_batch(batch, next_suffix):
+    """
+    Сохраняет пачку пар (номер строки, заметка).
+
+    Занятый заданный вручную slug — ошибка строки, как и в форме:
+    повторный импорт выгрузки не должен тихо создавать копии заметок
+    под другими адресами. Подбираются только пустые slug.
+    """
+    notes = [note for _, note in batch]
+    lines = {id(note): line_number for line_number, note in batch}
+    generated = {id(note) for note in notes if not note.slug}
+    try:
+        allocate_slugs(Note, notes, next_suffix)
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+        except IntegrityError:
+            # Пока подбирались slug, часть из них успели занять параллельно.
+            for note in notes:
+                _save_one(note, id(note) in generated, next_suffix)
+    except SlugConflictError as error:
+        raise NoteImportError(
+            lines[id(error.note)], error.slug + WARNING
+        )
+
+
+def _save_one(note, generated, next_suffix):
+    while True:
+        try:
+            note.save(force_insert=True)
+            return
+        except SlugConflictError as error:
+            if not generated:
+                error.note = note
+                raise
+            note.slug = ''
+            allocate_slugs(Note, [note], next_suffix)
+
+
+def import_notes(lines, author, batch_size=None):
+    """
+    Импортирует заметки из JSON Lines в одной транзакции.
+
+    Строки читаются и сохраняются пачками через bulk_create, поэтому
+    расход памяти не зависит от размера файла. При ошибке в любой строке,
+    в том числе при занятом slug, не сохраняется ничего.
+    """
+    batch_size = batch_size or settings.NOTES_IMPORT_BATCH_SIZE
+    notes = parse_notes(lines, author)
+    next_suffix = {}
+    created = 0
+    with transaction.atomic():
+        while True:
+            batch = list(islice(notes, batch_size))
+            if not batch:
+                break
+            _save_batch(batch, next_suffix)
+            created += len(batch)
+    return created
+
+
+def export_notes(author, chunk_size=2000):
+    """Построчно выгружает заметки пользователя в JSON Lines."""
+    rows = Note.objects.filter(author=author).order_by('id').values_list(
+        *EXPORT_FIELDS
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        note = dict(zip(EXPORT_FIELDS, row))
+        yield json.dumps(note, ensure_ascii=False) + '\n'
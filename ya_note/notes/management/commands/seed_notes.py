@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.seeding import BATCH_SIZE, seed_notes
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу заметками и пользователями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--notes', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            seeded = seed_notes(
+                options['notes'],
+                options['users'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            f'Создано пользователей: {len(seeded.users)}, '
+            f'заметок: {len(seeded.notes)}'
+        )
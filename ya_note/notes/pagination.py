@@ -0,0 +1,52 @@
+from django.http import Http404
+
+# Наибольший id, который помещается в INTEGER SQLite.
+MAX_ID = 2 ** 63 - 1
+
+
+class CursorPage:
+    """Страница заметок и курсор для перехода к следующей."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def parse_cursor(cursor):
+    try:
+        value = int(cursor)
+    except ValueError:
+        raise Http404('Некорректный курсор.')
+    if not 0 <= value <= MAX_ID:
+        raise Http404('Некорректный курсор.')
+    return value
+
+
+def get_cursor_page(queryset, cursor, per_page):
+    """
+    Страница заметок с id больше курсора.
+
+    Курсор — id последней заметки предыдущей страницы. Вместо OFFSET
+    выборка начинается с нужного места индекса по автору: вторичный
+    индекс SQLite хранит rowid и упорядочен по нему внутри автора,
+    поэтому дальние страницы не дороже первой.
+    """
+    queryset = queryset.order_by('id')
+    if cursor:
+        queryset = queryset.filter(id__gt=parse_cursor(cursor))
+    object_list = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        next_cursor = object_list[-1].id
+    return CursorPage(object_list, next_cursor)
@@ -0,0 +1,45 @@
+from collections import namedtuple
+
+from yacommon.seeding import (
+    BATCH_SIZE, bulk_create, phrase, pk_range, seeding
+)
+
+from .models import Note
+
+WORDS = (
+    'купить', 'молоко', 'хлеб', 'позвонить', 'маме', 'врач', 'отчёт',
+    'встреча', 'проект', 'отпуск', 'билеты', 'книга', 'спорт', 'зал',
+    'план', 'неделя', 'ремонт', 'кухня', 'подарок', 'день', 'рождения',
+    'машина', 'страховка', 'счета', 'оплатить', 'идея', 'заказ', 'рецепт',
+    'пирог', 'список',
+)
+
+Seeded = namedtuple('Seeded', ('users', 'notes'))
+
+
+def seed_notes(notes, users, seed=0, now=None, batch_size=BATCH_SIZE):
+    """
+    Создаёт пользователей и заметки с адресами seed-<pk>.
+
+    При одинаковом `seed` на той же базе получаются те же строки. Ключи
+    и адреса назначаются явно, поэтому save() с подбором адреса не
+    вызывается.
+    """
+    with seeding((Note,), users, seed, now, batch_size) as seeded:
+        rng = seeded.rng
+        if notes and not seeded.author_ids:
+            raise ValueError('Для заметок нужны пользователи.')
+        note_pks = pk_range(Note, notes)
+        bulk_create(Note, (
+            Note(
+                pk=pk,
+                title=phrase(rng, WORDS, 3).capitalize(),
+                text=phrase(
+                    rng, WORDS, rng.randint(5, 40)
+                ).capitalize() + '.',
+                slug=f'seed-{pk}',
+                author_id=rng.choice(seeded.author_ids),
+            )
+            for pk in note_pks
+        ), batch_size)
+    return Seeded(seeded.user_pks, note_pks)
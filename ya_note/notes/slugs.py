@@ -0,0 +1,209 @@
+import random
+from collections import Counter
+from contextlib import nullcontext
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from pytils.translit import slugify
+
+DEFAULT_SLUG = 'note'
+MAX_ATTEMPTS = 10
+CANDIDATES_PER_QUERY = 20
+
+
+class SlugConflictError(Exception):
+    """Заданный вручную slug уже занят другой заметкой."""
+
+    def __init__(self, slug, note=None):
+        super().__init__(slug)
+        self.slug = slug
+        self.note = note
+
+
+@lru_cache(maxsize=settings.NOTES_SLUG_CACHE_SIZE)
+def cached_slugify(title):
+    """Транслитерация заголовка с запоминанием последних результатов."""
+    return slugify(title)
+
+
+def slug_cache_stats():
+    info = cached_slugify.cache_info()
+    requests = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hit_rate': info.hits / requests if requests else 0.0,
+    }
+
+
+def with_suffix(slug, max_length, suffix):
+    """Добавляет к slug числовой суффикс, не выходя за max_length."""
+    if not suffix:
+        return slug
+    tail = f'-{suffix}'
+    return slug[:max_length - len(tail)] + tail
+
+
+def make_slug(title, max_length, suffix=0):
+    """Slug из заголовка, при необходимости с числовым суффиксом."""
+    slug = cached_slugify(title)[:max_length] or DEFAULT_SLUG
+    return with_suffix(slug, max_length, suffix)
+
+
+def find_free_slug(model, title, max_length, start=1, spread=False):
+    """
+    Подбирает первый свободный суффикс.
+
+    Кандидаты проверяются пачками одним запросом по уникальному индексу.
+    С `spread=True` берётся случайный из свободных кандидатов пачки,
+    чтобы конкурирующие запросы не выбирали раз за разом один и тот же.
+    """
+    while True:
+        candidates = {
+            make_slug(title, max_length, suffix): suffix
+            for suffix in range(start, start + CANDIDATES_PER_QUERY)
+        }
+        taken = set(
+            model._default_manager.filter(
+                slug__in=candidates
+            ).values_list('slug', flat=True)
+        )
+        free = [
+            (slug, suffix) for slug, suffix in candidates.items()
+            if slug not in taken
+        ]
+        if free:
+            return random.choice(free) if spread else free[0]
+        start += CANDIDATES_PER_QUERY
+
+
+def save_with_unique_slug(note, save, *args, **kwargs):
+    """
+    Сохраняет заметку, полагаясь на уникальный индекс по slug.
+
+    Первая попытка сразу выполняет INSERT/UPDATE без проверки EXISTS.
+    Если slug пустой, он строится из заголовка, а при конфликте
+    подбирается вариант с суффиксом и сохранение повторяется.
+    Конфликт заданного вручную slug превращается в SlugConflictError.
+    """
+    model = type(note)
+    max_length = model._meta.get_field('slug').max_length
+    generated = not note.slug
+    if generated:
+        note.slug = make_slug(note.title, max_length)
+    suffix = 0
+    for attempt in range(MAX_ATTEMPTS):
+        # Вне транзакции одиночный INSERT атомарен сам по себе, а точка
+        # сохранения нужна, только чтобы не сломать внешнюю транзакцию.
+        # Лишний BEGIN к тому же мешает SQLite дождаться блокировки на
+        # запись, если таблица с триггерами FTS5 занята другим потоком.
+        savepoint = (
+            transaction.atomic() if connection.in_atomic_block
+            else nullcontext()
+        )
+        try:
+            with savepoint:
+                save(*args, **kwargs)
+            return
+        except IntegrityError:
+            conflict = model._default_manager.filter(
+                slug=note.slug
+            ).exclude(pk=note.pk).exists()
+            if not conflict:
+                raise
+            if not generated:
+                raise SlugConflictError(note.slug)
+            # Повторный конфликт означает гонку с другими запросами.
+            note.slug, suffix = find_free_slug(
+                model, note.title, max_length, suffix + 1, spread=attempt > 0
+            )
+    raise SlugConflictError(note.slug)
+
+
+def taken_slugs(model, slugs, chunk_size=500):
+    """Какие из переданных slug уже заняты; запросы идут пачками."""
+    slugs = list(slugs)
+    taken = set()
+    for start in range(0, len(slugs), chunk_size):
+        taken.update(
+            model._default_manager.filter(
+                slug__in=slugs[start:start + chunk_size]
+            ).values_list('slug', flat=True)
+        )
+    return taken
+
+
+def reserve_explicit_slugs(notes, taken):
+    """Заданные вручную slug пачки; занятый или повторный — ошибка."""
+    reserved = set()
+    for note in notes:
+        if note.slug:
+            if note.slug in taken or note.slug in reserved:
+                raise SlugConflictError(note.slug, note)
+            reserved.add(note.slug)
+    return reserved
+
+
+def allocate_slugs(model, notes, next_suffix=None):
+    """
+    Назначает slug сразу пачке несохранённых заметок.
+
+    Заданные вручную slug не меняются: если такой slug уже занят в базе
+    или раньше в пачке, выбрасывается SlugConflictError с этой заметкой.
+    Пустые slug строятся из заголовков. Вместо запроса на каждую заметку
+    занятость проверяется одним запросом на всю пачку и ещё одним на
+    каждый круг подбора суффиксов. Словарь `next_suffix` запоминает,
+    с какого суффикса продолжать для каждой основы, чтобы следующие
+    пачки не перебирали уже занятые варианты заново.
+    """
+    if next_suffix is None:
+        next_suffix = {}
+    max_length = model._meta.get_field('slug').max_length
+    generated = [
+        (note, make_slug(note.title, max_length))
+        for note in notes if not note.slug
+    ]
+    taken = taken_slugs(
+        model,
+        {note.slug for note in notes if note.slug}
+        | {base for _, base in generated},
+    )
+    used = reserve_explicit_slugs(notes, taken) | taken
+    pending = []
+    for note, base in generated:
+        if base in used:
+            pending.append((note, base))
+        else:
+            note.slug = base
+            used.add(base)
+    while pending:
+        counts = Counter(base for _, base in pending)
+        candidates = {}
+        for base, count in counts.items():
+            start = next_suffix.get(base, 1)
+            if base not in next_suffix:
+                count += CANDIDATES_PER_QUERY
+            candidates[base] = [
+                (with_suffix(base, max_length, suffix), suffix)
+                for suffix in range(start, start + count)
+            ]
+        used |= taken_slugs(model, {
+            slug for variants in candidates.values() for slug, _ in variants
+        })
+        unresolved = []
+        for note, base in pending:
+            free = [
+                (slug, suffix) for slug, suffix in candidates[base]
+                if slug not in used
+            ]
+            if free:
+                note.slug, suffix = free[0]
+                used.add(note.slug)
+                next_suffix[base] = suffix + 1
+            else:
+                unresolved.append((note, base))
+                next_suffix[base] = candidates[base][-1][1] + 1
+        pending = unresolved
@@ -0,0 +1,62 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+PLANNED = ('SELECT', 'UPDATE', 'DELETE')
+FULL_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+class QueryBudgetMixin:
+    """
+    Ограничение числа запросов и просмотренных строк для тестов.
+
+    Строки считаются только для полных просмотров таблиц по плану
+    EXPLAIN QUERY PLAN: такой просмотр читает всю таблицу. Поиск по
+    индексу в бюджет строк не входит.
+    """
+
+    def scanned_tables(self, sql):
+        """Таблицы, которые запрос просматривает целиком."""
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[-1] for row in cursor.fetchall()]
+        tables = set(connection.introspection.table_names())
+        return [
+            match[1] for match in map(FULL_SCAN.match, details)
+            if match and match[1] in tables and 'VIRTUAL TABLE' not in
+            match.string
+        ]
+
+    def count_rows(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}'
+            )
+            return cursor.fetchone()[0]
+
+    @contextmanager
+    def assertQueryBudget(self, queries, rows=0):  # noqa: N802
+        """Не больше `queries` запросов и `rows` строк в полных просмотрах."""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = [query['sql'] for query in context.captured_queries]
+        self.assertLessEqual(
+            len(executed), queries,
+            'Превышен бюджет запросов:\n' + '\n'.join(executed)
+        )
+        if connection.vendor != 'sqlite':
+            return
+        scans = [
+            (table, sql)
+            for sql in executed if sql.lstrip().upper().startswith(PLANNED)
+            for table in self.scanned_tables(sql)
+        ]
+        scanned = sum(self.count_rows(table) for table, _ in scans)
+        self.assertLessEqual(
+            scanned, rows,
+            'Превышен бюджет просмотренных строк:\n' + '\n'.join(
+                f'{table}: {sql}' for table, sql in scans
+            )
+        )
@@ -1,3 +1,6 @@
+import json
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
@@ -10,6 +13,7 @@ User = get_user_model()
 NOTES_ADD_URL = 'notes:add'
 NOTES_EDIT_URL = 'notes:edit'
 NOTES_LIST_URL = 'notes:list'
+NOTES_SEARCH_URL = 'notes:search'
 
 
 class TestContent(TestCase):
@@ -38,6 +42,11 @@ class TestContent(TestCase):
         notes = response.context['object_list']
         self.assertNotIn(self.note, notes)
 
+    def test_notes_list_does_not_load_text(self):
+        response = self.author_client.get(reverse(NOTES_LIST_URL))
+        note = response.context['object_list'][0]
+        self.assertEqual(note.get_deferred_fields(), {'text', 'author_id'})
+
     def test_create_edit_note_page_contains_form(self):
         urls = (
             (NOTES_ADD_URL, None),
@@ -49,3 +58,110 @@ class TestContent(TestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestListPagination(TestCase):
+    NOTES_COUNT = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Иван Иванов')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст',
+                slug=f'note-{index}',
+                author=cls.author,
+            )
+            for index in range(cls.NOTES_COUNT)
+        )
+        cls.notes = list(Note.objects.order_by('id'))
+        cls.url = reverse(NOTES_LIST_URL)
+
+    def test_pages_cover_all_notes(self):
+        seen = []
+        query = {}
+        with self.settings(NOTES_COUNT_ON_LIST_PAGE=2):
+            while True:
+                response = self.author_client.get(self.url, query)
+                page = response.context['page']
+                self.assertLessEqual(len(page), 2)
+                seen.extend(page)
+                if not page.has_next:
+                    break
+                query['cursor'] = page.next_cursor
+        self.assertEqual(seen, self.notes)
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', '-1', str(2 ** 64)):
+            with self.subTest(cursor=cursor):
+                response = self.author_client.get(
+                    self.url, {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_stream_html_matches_single_page(self):
+        with self.settings(NOTES_STREAM_CHUNK_SIZE=2):
+            response = self.author_client.get(self.url, {'stream': 'html'})
+            streamed = b''.join(response.streaming_content).decode()
+        page = self.author_client.get(self.url).content.decode()
+        # Отступы в потоке другие: сравниваем разметку без пробелов.
+        self.assertEqual(''.join(streamed.split()), ''.join(page.split()))
+
+    def test_stream_json(self):
+        with self.settings(NOTES_STREAM_CHUNK_SIZE=2):
+            response = self.author_client.get(self.url, {'stream': 'json'})
+            rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(rows, [
+            {'id': note.id, 'title': note.title, 'slug': note.slug}
+            for note in self.notes
+        ])
+
+
+class TestSearch(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Иван Иванов')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Сергей Петров')
+        cls.in_text = Note.objects.create(
+            title='Покупки', text='Купить ёлку и гирлянду', author=cls.author
+        )
+        cls.in_title = Note.objects.create(
+            title='Ёлка', text='Нарядить к празднику', author=cls.author
+        )
+        cls.foreign = Note.objects.create(
+            title='Ёлка', text='Чужая заметка', author=cls.reader
+        )
+
+    def search(self, query):
+        response = self.author_client.get(
+            reverse(NOTES_SEARCH_URL), {'q': query}
+        )
+        return list(response.context['object_list'])
+
+    def test_search_is_ranked_and_scoped_to_user(self):
+        self.assertEqual(self.search('ёлк'), [self.in_title, self.in_text])
+
+    def test_search_index_follows_changes(self):
+        self.in_text.text = 'Купить гирлянду'
+        self.in_text.save()
+        self.in_title.delete()
+        self.assertEqual(self.search('ёлка'), [])
+        self.assertEqual(self.search('гирлянду'), [self.in_text])
+
+    def test_empty_query(self):
+        self.assertEqual(self.search(' "*" '), [])
+
+    def test_search_is_paginated(self):
+        with self.settings(NOTES_SEARCH_PAGE_SIZE=1):
+            response = self.author_client.get(
+                reverse(NOTES_SEARCH_URL), {'q': 'ёлк', 'page': 2}
+            )
+        self.assertEqual(
+            list(response.context['object_list']), [self.in_text]
+        )
@@ -1,18 +1,28 @@
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import cached_slugify, slug_cache_stats
 
 User = get_user_model()
 
 NOTES_ADD_URL = 'notes:add'
 NOTES_DELETE_URL = 'notes:delete'
 NOTES_EDIT_URL = 'notes:edit'
+NOTES_EXPORT_URL = 'notes:export'
+NOTES_IMPORT_URL = 'notes:import'
 NOTES_SUCCESS_URL = 'notes:success'
 USERS_LOGIN_URL = 'users:login'
 
@@ -83,6 +93,28 @@ class TestLogic(TestCase):
         expected_slug = slugify(self.form_data['title'])
         self.assertEqual(new_note.slug, expected_slug)
 
+    def test_empty_slug_gets_suffix_on_collision(self):
+        url = reverse(NOTES_ADD_URL)
+        self.form_data.pop('slug')
+        Note.objects.create(
+            title=self.form_data['title'], text='Текст', author=self.author
+        )
+        response = self.author_client.post(url, data=self.form_data)
+        self.assertRedirects(response, reverse(NOTES_SUCCESS_URL))
+        expected_slug = slugify(self.form_data['title']) + '-1'
+        self.assertTrue(Note.objects.filter(slug=expected_slug).exists())
+
+    def test_slugify_is_memoized(self):
+        cached_slugify.cache_clear()
+        for _ in range(3):
+            self.assertEqual(
+                cached_slugify(self.form_data['title']),
+                slugify(self.form_data['title'])
+            )
+        stats = slug_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 1))
+        self.assertAlmostEqual(stats['hit_rate'], 2 / 3)
+
     def test_author_can_edit_note(self):
         url = reverse(NOTES_EDIT_URL, args=(self.note.slug,))
         response = self.author_client.post(url, self.form_data)
@@ -114,3 +146,120 @@ class TestLogic(TestCase):
         response = self.reader_client.post(url)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(Note.objects.count(), start_objects_count)
+
+
+class TestBulk(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Иван Иванов')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='slug', author=cls.author
+        )
+
+    def import_lines(self, *notes):
+        body = '\n'.join(
+            json.dumps(note, ensure_ascii=False) for note in notes
+        )
+        return self.author_client.post(
+            reverse(NOTES_IMPORT_URL),
+            data=body.encode(),
+            content_type='application/x-ndjson',
+        )
+
+    def test_import_allocates_slugs_in_batch(self):
+        base = slugify('Заголовок')
+        response = self.import_lines(
+            {'title': 'Заголовок', 'text': 'Текст'},
+            {'title': 'Заголовок', 'text': 'Текст'},
+            {'title': 'Заголовок', 'text': 'Текст', 'slug': base},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(response.json(), {'created': 3})
+        slugs = set(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(slugs, {'slug', base, f'{base}-1', f'{base}-2'})
+
+    def test_import_rejects_taken_slug(self):
+        cases = (
+            ({'title': 'Новая', 'text': 'Текст', 'slug': self.note.slug},),
+            (
+                {'title': 'Первая', 'text': 'Текст', 'slug': 'new-slug'},
+                {'title': 'Вторая', 'text': 'Текст', 'slug': 'new-slug'},
+            ),
+        )
+        for lines in cases:
+            with self.subTest(lines=lines):
+                response = self.import_lines(
+                    {'title': 'Без slug', 'text': 'Текст'}, *lines
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+                self.assertIn(
+                    f'Строка {len(lines) + 1}: {lines[-1]["slug"]}{WARNING}',
+                    response.json()['error'],
+                )
+                self.assertEqual(Note.objects.count(), 1)
+
+    def test_invalid_line_imports_nothing(self):
+        response = self.import_lines(
+            {'title': 'Заголовок', 'text': 'Текст'},
+            {'title': 'Без текста'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('Строка 2', response.json()['error'])
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_export_streams_json_lines(self):
+        response = self.author_client.get(reverse(NOTES_EXPORT_URL))
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{'title': 'Заголовок', 'text': 'Текст', 'slug': 'slug'}]
+        )
+
+    def test_commands_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'notes.jsonl'
+            call_command('export_notes', self.author.username, str(path))
+            with self.assertRaisesMessage(CommandError, 'Строка 1'):
+                call_command(
+                    'import_notes', self.author.username, str(path),
+                    stdout=StringIO()
+                )
+            self.note.delete()
+            call_command(
+                'import_notes', self.author.username, str(path),
+                stdout=StringIO()
+            )
+        imported = Note.objects.get()
+        self.assertEqual(imported.title, self.note.title)
+        self.assertEqual(imported.slug, self.note.slug)
+
+
+class TestConcurrentSlugs(TransactionTestCase):
+    THREADS = 8
+    NOTES_PER_THREAD = 5
+    TITLE = 'Одинаковый заголовок'
+
+    def setUp(self):
+        self.author = User.objects.create(username='Иван Иванов')
+
+    def create_notes(self, _):
+        try:
+            for _ in range(self.NOTES_PER_THREAD):
+                Note.objects.create(
+                    title=self.TITLE, text='Текст', author=self.author
+                )
+        finally:
+            connection.close()
+
+    def test_same_title_from_many_threads(self):
+        with ThreadPoolExecutor(self.THREADS) as executor:
+            list(executor.map(self.create_notes, range(self.THREADS)))
+        slugs = list(Note.objects.values_list('slug', flat=True))
+        self.assertEqual(len(slugs), self.THREADS * self.NOTES_PER_THREAD)
+        self.assertEqual(len(set(slugs)), len(slugs))
+        self.assertIn(slugify(self.TITLE), slugs)
@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yacommon import profiling
+
+User = get_user_model()
+
+CPU_PROFILE_URL = 'cpu_profile'
+NOTES_LIST_URL = 'notes:list'
+PROFILING_URL = 'profiling'
+
+
+@override_settings(PROFILING_SAMPLE_RATE=1)
+class TestProfiling(TestCase):
+    """Сам профилировщик проверяется в yacommon/tests."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create(username='Сотрудник', is_staff=True)
+
+    def setUp(self):
+        profiling.reset()
+        self.addCleanup(profiling.reset)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_profiling_is_wired(self):
+        self.staff_client.get(reverse(NOTES_LIST_URL))
+        response = self.staff_client.get(reverse(PROFILING_URL))
+        self.assertIn(NOTES_LIST_URL, response.json()['views'])
+        response = self.staff_client.get(reverse(CPU_PROFILE_URL))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_profiling_reports_are_hidden(self):
+        for name in (PROFILING_URL, CPU_PROFILE_URL):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
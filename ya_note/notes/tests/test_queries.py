@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.query_budget import QueryBudgetMixin
+
+User = get_user_model()
+
+NOTES_ADD_URL = 'notes:add'
+NOTES_DELETE_URL = 'notes:delete'
+NOTES_DETAIL_URL = 'notes:detail'
+NOTES_EDIT_URL = 'notes:edit'
+NOTES_EXPORT_URL = 'notes:export'
+NOTES_LIST_URL = 'notes:list'
+NOTES_SEARCH_URL = 'notes:search'
+
+# Сессия и пользователь.
+AUTH_QUERIES = 2
+
+
+class TestQueryBudget(QueryBudgetMixin, TestCase):
+    NOTES_COUNT = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Иван Иванов')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Сергей Петров')
+        for user in (cls.author, cls.reader):
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {index}',
+                    text='Текст',
+                    slug=f'{user.pk}-{index}',
+                    author=user,
+                )
+                for index in range(cls.NOTES_COUNT)
+            )
+        cls.note = Note.objects.filter(author=cls.author).first()
+        cls.form_data = {'title': 'Заголовок', 'text': 'Текст', 'slug': ''}
+
+    def test_get_pages(self):
+        slug = (self.note.slug,)
+        for name, args, queries in (
+            (NOTES_ADD_URL, None, 0),
+            (NOTES_LIST_URL, None, 1),
+            (NOTES_DETAIL_URL, slug, 1),
+            (NOTES_EDIT_URL, slug, 1),
+            (NOTES_DELETE_URL, slug, 1),
+            (NOTES_EXPORT_URL, None, 1),
+            (NOTES_SEARCH_URL, None, 3),
+        ):
+            with self.subTest(name=name):
+                url = reverse(name, args=args)
+                with self.assertQueryBudget(AUTH_QUERIES + queries):
+                    response = self.author_client.get(url, {'q': 'заметка'})
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+
+    # Внутри транзакции теста сохранение заметки обрамляется SAVEPOINT
+    # и RELEASE, вне теста этих двух запросов нет.
+    def test_create(self):
+        with self.assertQueryBudget(AUTH_QUERIES + 3):
+            self.author_client.post(reverse(NOTES_ADD_URL), self.form_data)
+
+    def test_edit(self):
+        url = reverse(NOTES_EDIT_URL, args=(self.note.slug,))
+        with self.assertQueryBudget(AUTH_QUERIES + 4):
+            self.author_client.post(url, self.form_data)
+
+    def test_delete(self):
+        url = reverse(NOTES_DELETE_URL, args=(self.note.slug,))
+        with self.assertQueryBudget(AUTH_QUERIES + 2):
+            self.author_client.post(url)
+
+    def test_full_scan_exceeds_budget(self):
+        with self.assertRaisesRegex(AssertionError, 'notes_note'):
+            with self.assertQueryBudget(1):
+                Note.objects.filter(text='Текст').count()
@@ -12,8 +12,11 @@ NOTES_ADD_URL = 'notes:add'
 NOTES_DELETE_URL = 'notes:delete'
 NOTES_DETAIL_URL = 'notes:detail'
 NOTES_EDIT_URL = 'notes:edit'
+NOTES_EXPORT_URL = 'notes:export'
+NOTES_IMPORT_URL = 'notes:import'
 NOTES_HOME_URL = 'notes:home'
 NOTES_LIST_URL = 'notes:list'
+NOTES_SEARCH_URL = 'notes:search'
 NOTES_SUCCESS_URL = 'notes:success'
 USERS_LOGIN_URL = 'users:login'
 USERS_LOGOUT_URL = 'users:logout'
@@ -52,6 +55,8 @@ class TestRoutes(TestCase):
             NOTES_LIST_URL,
             NOTES_ADD_URL,
             NOTES_SUCCESS_URL,
+            NOTES_EXPORT_URL,
+            NOTES_SEARCH_URL,
         )
         for name in urls:
             with self.subTest(name=name):
@@ -80,6 +85,9 @@ class TestRoutes(TestCase):
             (NOTES_ADD_URL, None),
             (NOTES_SUCCESS_URL, None),
             (NOTES_LIST_URL, None),
+            (NOTES_EXPORT_URL, None),
+            (NOTES_IMPORT_URL, None),
+            (NOTES_SEARCH_URL, None),
         )
         login_url = reverse(USERS_LOGIN_URL)
         for name, args in urls:
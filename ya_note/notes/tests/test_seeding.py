@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from notes.models import Note
+from notes.seeding import seed_notes
+from yacommon.search import search
+
+User = get_user_model()
+
+
+class TestSeeding(TestCase):
+    NOTES_COUNT = 500
+    USERS_COUNT = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seeded = seed_notes(cls.NOTES_COUNT, cls.USERS_COUNT, seed=3)
+
+    def snapshot(self):
+        return list(Note.objects.order_by('pk').values_list())
+
+    def test_seeded_rows(self):
+        self.assertEqual(Note.objects.count(), self.NOTES_COUNT)
+        self.assertEqual(len(self.seeded.users), self.USERS_COUNT)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(), self.NOTES_COUNT
+        )
+        self.assertTrue(set(
+            Note.objects.values_list('author', flat=True)
+        ) <= set(self.seeded.users))
+
+    def test_same_seed_gives_same_rows(self):
+        first = self.snapshot()
+        Note.objects.all().delete()
+        seed_notes(self.NOTES_COUNT, 0, seed=3)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_seeded_notes_are_searchable(self):
+        note = Note.objects.get(pk=self.seeded.notes[0])
+        word = note.text.split()[1]
+        found = search(Note.objects.filter(author=note.author), word)
+        self.assertIn(note, found[:self.NOTES_COUNT])
+
+    def test_seed_keeps_autoincrement(self):
+        note = Note.objects.create(
+            text='Текст', author=User.objects.get(pk=self.seeded.users[0])
+        )
+        self.assertEqual(note.pk, self.seeded.notes[-1] + 1)
+
+    def test_seed_notes_command(self):
+        stdout = StringIO()
+        call_command('seed_notes', '--users=2', '--notes=5', stdout=stdout)
+        self.assertEqual(
+            stdout.getvalue(), 'Создано пользователей: 2, заметок: 5\n'
+        )
+        self.assertEqual(Note.objects.count(), self.NOTES_COUNT + 5)
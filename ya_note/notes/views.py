@@ -1,9 +1,27 @@
+import json
+from http import HTTPStatus
+from itertools import islice
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse, StreamingHttpResponse
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse_lazy
+from django.utils.safestring import mark_safe
 from django.views import generic
 
-from .forms import NoteForm
+from yacommon.search import search
+
+from .bulk import NoteImportError, export_notes, import_notes
+from .forms import WARNING, NoteForm
 from .models import Note
+from .pagination import get_cursor_page
+from .slugs import SlugConflictError
+
+# Поля заметки, которые нужны спискам.
+LIST_FIELDS = ('title', 'slug')
+# Место строк списка в странице при потоковой выдаче.
+ROWS_MARKER = mark_safe('<!-- notes -->')
 
 
 class Home(generic.TemplateView):
@@ -26,22 +44,30 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormBase(NoteBase):
+    """Базовый класс для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Занятый slug показываем как ошибку формы, а не как 500."""
+        try:
+            return super().form_valid(form)
+        except SlugConflictError as error:
+            form.add_error('slug', error.slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteFormBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -50,10 +76,120 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя постранично по курсору.
+
+    С параметром stream=html или stream=json отдаёт сразу все заметки
+    потоком: строки читаются из итератора и рендерятся пачками, поэтому
+    память не зависит от числа заметок.
+    """
     template_name = 'notes/list.html'
+    rows_template_name = 'notes/includes/list_rows.html'
+
+    def get_queryset(self):
+        # Список выводит только заголовок и ссылку: текст не загружаем.
+        return super().get_queryset().only(*LIST_FIELDS).order_by('id')
+
+    def get(self, request, *args, **kwargs):
+        stream = request.GET.get('stream')
+        if stream == 'html':
+            return StreamingHttpResponse(self.stream_html())
+        if stream == 'json':
+            return StreamingHttpResponse(
+                self.stream_json(), content_type='application/json'
+            )
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        page = get_cursor_page(
+            self.object_list,
+            self.request.GET.get('cursor'),
+            settings.NOTES_COUNT_ON_LIST_PAGE,
+        )
+        context = super().get_context_data(
+            object_list=page.object_list, **kwargs
+        )
+        context['page'] = page
+        return context
+
+    def iter_chunks(self):
+        """Заметки словарями, пачками по NOTES_STREAM_CHUNK_SIZE."""
+        size = settings.NOTES_STREAM_CHUNK_SIZE
+        rows = self.get_queryset().values('id', *LIST_FIELDS).iterator(
+            chunk_size=size
+        )
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def stream_html(self):
+        # Страница рендерится один раз с меткой на месте строк списка.
+        head, tail = render_to_string(
+            self.template_name, {'rows_marker': ROWS_MARKER}, self.request
+        ).split(ROWS_MARKER)
+        rows_template = get_template(self.rows_template_name)
+        yield head
+        for chunk in self.iter_chunks():
+            yield rows_template.render({'notes': chunk})
+        yield tail
+
+    def stream_json(self):
+        separator = ''
+        yield '['
+        for chunk in self.iter_chunks():
+            yield separator + ','.join(
+                json.dumps(note, ensure_ascii=False) for note in chunk
+            )
+            separator = ','
+        yield ']'
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_SEARCH_PAGE_SIZE
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return search(
+            super().get_queryset().only(*LIST_FIELDS), self.query
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        return context
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в JSON Lines."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(request.user),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.jsonl"'
+        return response
+
+
+class NotesImport(LoginRequiredMixin, generic.View):
+    """Загрузка заметок из JSON Lines в теле запроса."""
+
+    def post(self, request, *args, **kwargs):
+        try:
+            created = import_notes(request, request.user)
+        except NoteImportError as error:
+            return JsonResponse(
+                {'error': str(error)}, status=HTTPStatus.BAD_REQUEST
+            )
+        return JsonResponse({'created': created}, status=HTTPStatus.CREATED)
@@ -1,7 +1,18 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
+from yacommon.settings import (  # noqa: F401
+    CPU_PROFILING_HEADER,
+    CPU_PROFILING_IDLE_SECONDS,
+    CPU_PROFILING_INTERVAL,
+    LOGGING,
+    PROFILING_DUPLICATE_THRESHOLD,
+    PROFILING_LOG_INTERVAL,
+    PROFILING_MIDDLEWARE,
+)
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
@@ -22,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    *PROFILING_MIDDLEWARE,
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,8 +66,17 @@ WSGI_APPLICATION = 'yanote.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # SQLite с WAL и прагмами для одновременной работы, см. yacommon.sqlite.
+        'ENGINE': 'yacommon.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переиспользуется между запросами, и прагмы
+        # не выполняются заново на каждый запрос.
+        'CONN_MAX_AGE': 60,
+        # Файловая тестовая база нужна для тестов с несколькими потоками:
+        # общая in-memory база SQLite блокирует таблицы без ожидания.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -87,3 +108,28 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_SLUG_CACHE_SIZE = 4096
+
+NOTES_IMPORT_BATCH_SIZE = 1000
+
+NOTES_SEARCH_PAGE_SIZE = 20
+
+NOTES_COUNT_ON_LIST_PAGE = 100
+
+# Сколько заметок читается из базы и рендерится за раз при потоковой
+# выдаче списка (?stream=html или ?stream=json).
+NOTES_STREAM_CHUNK_SIZE = 2000
+
+# Профилирование запросов, см. yacommon.profiling: доля замеряемых
+# запросов от 0 до 1. При 0 middleware отключается.
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YANOTE_PROFILING_SAMPLE_RATE', '0')
+)
+
+# Выборочное профилирование CPU по SIGPROF, см. yacommon.profiling.
+# Остальные настройки профилирования общие, см. yacommon.settings.
+CPU_PROFILING = os.environ.get('YANOTE_CPU_PROFILING') == '1'
+
+# Представления, которые профилируются всегда; шаблоны fnmatch по view_name.
+CPU_PROFILING_VIEWS = ('notes:add',)
@@ -4,9 +4,15 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from yacommon.profiling import CpuProfileExport, ProfilingReport
+
 urlpatterns = [
     path('', include('notes.urls')),
     path('admin/', admin.site.urls),
+    path('profiling/', ProfilingReport.as_view(), name='profiling'),
+    path(
+        'profiling/cpu/', CpuProfileExport.as_view(), name='cpu_profile'
+    ),
 ]
 
 auth_urls = ([
@@ -0,0 +1,503 @@
+import logging
+import random
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.template.base import Template
+from django.utils.deprecation import MiddlewareMixin
+from django.views import generic
+
+from .views import StaffOnlyMixin
+
+logger = logging.getLogger(__name__)
+
+# Сколько повторяющихся запросов хранится в сводке одного представления.
+MAX_SUSPECTS = 5
+
+_current_profile = ContextVar('current_profile', default=None)
+_stats = {}
+_lock = threading.Lock()
+_last_dump = time.monotonic()
+_profiled_requests = 0
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+_sampler_installed = False
+_timer_started = False
+_last_sampled = 0.0
+_sampled_threads = {}
+_cpu_stacks = Counter()
+_cpu_lock = threading.Lock()
+_request_thread = threading.local()
+
+
+class RequestProfile:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.rendering = False
+        self.start = time.perf_counter()
+        self.blocks = sys.getallocatedblocks()
+
+
+class ViewStats:
+    """Накопленные замеры одного представления."""
+
+    def __init__(self):
+        self.requests = 0
+        self.total_time = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.python_time = 0.0
+        self.allocations = 0
+        self.slowest = 0.0
+        self.duplicates = 0
+        self.suspects = {}
+
+    def add(self, profile, total):
+        self.requests += 1
+        self.total_time += total
+        self.sql_count += sum(profile.queries.values())
+        self.sql_time += profile.sql_time
+        self.render_time += profile.render_time
+        self.python_time += max(
+            total - profile.sql_time - profile.render_time, 0.0
+        )
+        self.allocations += sys.getallocatedblocks() - profile.blocks
+        self.slowest = max(self.slowest, total)
+        repeated = {
+            sql: count for sql, count in profile.queries.items()
+            if count >= settings.PROFILING_DUPLICATE_THRESHOLD
+        }
+        if repeated:
+            self.duplicates += 1
+        for sql, count in repeated.items():
+            self.suspects[sql] = max(self.suspects.get(sql, 0), count)
+        if len(self.suspects) > MAX_SUSPECTS:
+            self.suspects = dict(sorted(
+                self.suspects.items(), key=lambda item: -item[1]
+            )[:MAX_SUSPECTS])
+
+    def as_dict(self):
+        """Средние на запрос; время в миллисекундах."""
+        def per_request(value, scale=1):
+            return round(value * scale / self.requests, 2)
+
+        return {
+            'requests': self.requests,
+            'total_ms': per_request(self.total_time, 1e3),
+            'sql_count': per_request(self.sql_count),
+            'sql_ms': per_request(self.sql_time, 1e3),
+            'template_ms': per_request(self.render_time, 1e3),
+            'python_ms': per_request(self.python_time, 1e3),
+            'allocated_blocks': per_request(self.allocations),
+            'slowest_ms': round(self.slowest * 1e3, 2),
+            'n_plus_one_requests': self.duplicates,
+            'n_plus_one_suspects': [
+                {'sql': sql, 'repeats': count}
+                for sql, count in self.suspects.items()
+            ],
+        }
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка выполнения SQL: считает запросы профилируемого запроса."""
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.sql_time += time.perf_counter() - start
+        profile.queries[sql] += 1
+
+
+def profile_render(render):
+    """Обёртка Template.render: время внешних шаблонов без вложенных."""
+    @wraps(render)
+    def wrapper(self, context):
+        profile = _current_profile.get()
+        if profile is None or profile.rendering:
+            return render(self, context)
+        profile.rendering = True
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.render_time += time.perf_counter() - start
+            profile.rendering = False
+
+    return wrapper
+
+
+def start_profiling(profile):
+    """
+    Делает `profile` текущим замером потока.
+
+    Template.render подменяется только пока идёт хотя бы один замер, и
+    вне выборки шаблоны рендерятся без обёртки.
+    """
+    global _profiled_requests
+    with _lock:
+        if not _profiled_requests:
+            Template.render = profile_render(Template.render)
+        _profiled_requests += 1
+    _current_profile.set(profile)
+
+
+def stop_profiling():
+    global _profiled_requests
+    # Поток WSGI-сервера обслуживает и следующие запросы.
+    _current_profile.set(None)
+    with _lock:
+        _profiled_requests -= 1
+        if not _profiled_requests:
+            Template.render = Template.render.__wrapped__
+
+
+def install_wrapper(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def get_report():
+    """Сводка по представлениям, от самых долгих в сумме."""
+    with _lock:
+        items = sorted(
+            _stats.items(),
+            key=lambda item: -item[1].total_time,
+        )
+        return {name: stats.as_dict() for name, stats in items}
+
+
+def reset():
+    """Сбрасывает накопленные замеры и останавливает таймер выборки."""
+    global _last_dump, _timer_started
+    with _lock:
+        _stats.clear()
+        _last_dump = time.monotonic()
+    with _cpu_lock:
+        if _timer_started:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            _timer_started = False
+    _cpu_stacks.clear()
+
+
+def dump_report():
+    for name, report in get_report().items():
+        logger.info(
+            '%s: %d запросов по %.2f мс, SQL %.1f за %.2f мс, '
+            'шаблоны %.2f мс, Python %.2f мс, блоков памяти %+.0f, '
+            'N+1 в %d запросах',
+            name, report['requests'], report['total_ms'],
+            report['sql_count'],
+            report['sql_ms'], report['template_ms'], report['python_ms'],
+            report['allocated_blocks'], report['n_plus_one_requests'],
+        )
+        for suspect in report['n_plus_one_suspects']:
+            logger.warning(
+                '%s: возможный N+1, %d повторов: %s',
+                name, suspect['repeats'], suspect['sql'],
+            )
+
+
+def record(view_name, profile, total):
+    global _last_dump
+    with _lock:
+        _stats.setdefault(view_name, ViewStats()).add(profile, total)
+        now = time.monotonic()
+        due = now - _last_dump >= settings.PROFILING_LOG_INTERVAL
+        if due:
+            _last_dump = now
+    if due:
+        dump_report()
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """
+    Замеряет долю PROFILING_SAMPLE_RATE запросов по имени представления.
+
+    Для каждого замеренного запроса считаются число и время SQL-запросов,
+    время рендеринга шаблонов, остальное время Python и прирост
+    выделенных блоков памяти. Прирост считается по всему процессу, поэтому
+    при параллельных запросах это оценка. Один и тот же SQL, выполненный
+    не меньше PROFILING_DUPLICATE_THRESHOLD раз, отмечается как возможный
+    N+1. Запросы вне выборки платят только за random(). Потоковые ответы
+    замеряются до начала выдачи. При нулевой доле middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if settings.PROFILING_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        connection_created.connect(install_wrapper)
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return
+        # Соединения, открытые до подключения сигнала.
+        for connection in connections.all():
+            install_wrapper(connection)
+        request.profile = RequestProfile()
+        start_profiling(request.profile)
+
+    def process_response(self, request, response):
+        profile = getattr(request, 'profile', None)
+        if profile is None:
+            return response
+        stop_profiling()
+        if request.resolver_match is not None:
+            record(
+                request.resolver_match.view_name, profile,
+                time.perf_counter() - profile.start,
+            )
+        return response
+
+
+def sample_stacks(signum, frame):
+    """
+    Обработчик SIGPROF: стеки потоков, которые сейчас профилируются.
+
+    Выполняется в главном потоке между инструкциями байт-кода, поэтому
+    только добавляет в счётчик кортеж объектов кода без блокировок.
+    Без профилируемых потоков проверяет, не пора ли остановить таймер.
+    """
+    if not _sampled_threads:
+        stop_idle_timer()
+        return
+    frames = sys._current_frames()
+    current = threading.get_ident()
+    for ident, view_name in list(_sampled_threads.items()):
+        top = frame if ident == current else frames.get(ident)
+        stack = []
+        while top is not None:
+            stack.append(top.f_code)
+            top = top.f_back
+        if stack:
+            _cpu_stacks[(view_name, *reversed(stack))] += 1
+
+
+def install_cpu_sampler():
+    """
+    Ставит обработчик SIGPROF, если включён CPU_PROFILING.
+
+    Обработчик сигнала ставится только из главного потока, поэтому
+    функция вызывается в manage.py и wsgi.py до загрузки middleware:
+    runserver с автоперезагрузкой обслуживает запросы в другом потоке.
+    """
+    global _sampler_installed
+    if (not _sampler_installed and settings.CPU_PROFILING
+            and hasattr(signal, 'SIGPROF')
+            and threading.current_thread() is threading.main_thread()):
+        signal.signal(signal.SIGPROF, sample_stacks)
+        _sampler_installed = True
+    return _sampler_installed
+
+
+def block_sigprof():
+    """
+    Не даёт SIGPROF прийти в поток запроса.
+
+    ITIMER_PROF шлёт сигнал потоку, который тратит процессорное время, а
+    обработчик Python выполнится только в главном потоке, и выборка
+    опоздала бы. Заблокированный в потоках запросов сигнал ядро отдаёт
+    главному потоку, и тот сразу просыпается.
+    """
+    if (not getattr(_request_thread, 'blocked', False)
+            and threading.current_thread() is not threading.main_thread()):
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGPROF})
+        _request_thread.blocked = True
+
+
+def start_sampling(view_name):
+    """
+    Включает выборку стеков текущего потока и при надобности таймер.
+
+    Таймер не выключается после каждого запроса: ядро проверяет его
+    только на тиках планировщика, и таймер, заведённый на время короткого
+    запроса, почти не срабатывал бы. Первый сигнал приходит через
+    случайную долю периода, чтобы первые запросы после простоя попадали
+    в выборку пропорционально своей длине.
+    """
+    global _timer_started
+    with _cpu_lock:
+        if not _timer_started:
+            interval = settings.CPU_PROFILING_INTERVAL
+            signal.setitimer(
+                signal.ITIMER_PROF,
+                random.uniform(0, interval) or interval,
+                interval,
+            )
+            _timer_started = True
+        _sampled_threads[threading.get_ident()] = view_name
+
+
+def stop_sampling():
+    global _last_sampled
+    with _cpu_lock:
+        _sampled_threads.pop(threading.get_ident(), None)
+        _last_sampled = time.monotonic()
+
+
+def stop_idle_timer():
+    """
+    Останавливает таймер, если CPU_PROFILING_IDLE_SECONDS не было
+    профилируемых запросов.
+
+    Вызывается из обработчика сигнала, а главный поток мог получить
+    сигнал, сам удерживая блокировку, поэтому она только пробуется.
+    """
+    global _timer_started
+    if not _cpu_lock.acquire(blocking=False):
+        return
+    try:
+        if (_timer_started and not _sampled_threads
+                and time.monotonic() - _last_sampled
+                >= settings.CPU_PROFILING_IDLE_SECONDS):
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            _timer_started = False
+    finally:
+        _cpu_lock.release()
+
+
+def frame_name(code):
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+def export_collapsed():
+    """Стеки в формате collapsed для flamegraph.pl и speedscope."""
+    return ''.join(
+        ';'.join([view_name, *map(frame_name, stack)]) + f' {count}\n'
+        for (view_name, *stack), count in sorted(
+            dict(_cpu_stacks).items(), key=lambda item: -item[1]
+        )
+    )
+
+
+def export_speedscope():
+    """Стеки в формате speedscope: отдельный профиль на представление."""
+    scale = settings.CPU_PROFILING_INTERVAL * 1e3
+    frames = {}
+    profiles = {}
+    for (view_name, *stack), count in dict(_cpu_stacks).items():
+        profile = profiles.setdefault(view_name, {
+            'type': 'sampled', 'name': view_name, 'unit': 'milliseconds',
+            'startValue': 0, 'endValue': 0, 'samples': [], 'weights': [],
+        })
+        profile['samples'].append(
+            [frames.setdefault(code, len(frames)) for code in stack]
+        )
+        profile['weights'].append(count * scale)
+        profile['endValue'] += count * scale
+    return {
+        '$schema': SPEEDSCOPE_SCHEMA,
+        'name': 'CPU',
+        'shared': {'frames': [
+            {
+                'name': code.co_name,
+                'file': code.co_filename,
+                'line': code.co_firstlineno,
+            }
+            for code in frames
+        ]},
+        'profiles': list(profiles.values()),
+    }
+
+
+class CpuProfilingMiddleware(MiddlewareMixin):
+    """
+    Выборочное профилирование CPU по сигналу SIGPROF.
+
+    Профилируются представления из CPU_PROFILING_VIEWS и запросы
+    сотрудников с заголовком CPU_PROFILING_HEADER. Пока такой запрос
+    выполняется, обработчик таймера ITIMER_PROF, который срабатывает
+    каждые CPU_PROFILING_INTERVAL секунд процессорного времени, снимает
+    стек его потока; стеки копятся между запросами. Через
+    CPU_PROFILING_IDLE_SECONDS без таких запросов таймер останавливается.
+    Ответ рендерится до process_response и попадает в замер, потоковая
+    выдача — нет. Без CPU_PROFILING middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        if not settings.CPU_PROFILING:
+            raise MiddlewareNotUsed
+        if not _sampler_installed:
+            logger.warning(
+                'Профилирование CPU выключено: install_cpu_sampler() '
+                'не вызван из главного потока.'
+            )
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        block_sigprof()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_profiled(request):
+            request.cpu_profiled = True
+            start_sampling(request.resolver_match.view_name)
+
+    def process_response(self, request, response):
+        if getattr(request, 'cpu_profiled', False):
+            stop_sampling()
+        return response
+
+    def is_profiled(self, request):
+        view_name = request.resolver_match.view_name
+        if any(
+            fnmatchcase(view_name, pattern)
+            for pattern in settings.CPU_PROFILING_VIEWS
+        ):
+            return True
+        return (
+            settings.CPU_PROFILING_HEADER in request.headers
+            and request.user.is_staff
+        )
+
+
+class ProfilingReport(StaffOnlyMixin, generic.View):
+    """Сводка профилирования в JSON."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(
+            {
+                'sample_rate': settings.PROFILING_SAMPLE_RATE,
+                'views': get_report(),
+            },
+            json_dumps_params={'ensure_ascii': False},
+        )
+
+
+class CpuProfileExport(StaffOnlyMixin, generic.View):
+    """Накопленные стеки CPU файлом: ?format=collapsed или speedscope."""
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'collapsed')
+        if export_format == 'collapsed':
+            response = HttpResponse(
+                export_collapsed(), content_type='text/plain; charset=utf-8'
+            )
+            filename = 'cpu.collapsed'
+        elif export_format == 'speedscope':
+            response = JsonResponse(export_speedscope())
+            filename = 'cpu.speedscope.json'
+        else:
+            return HttpResponseBadRequest('Неизвестный формат.')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,35 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS
+
+_read_database = ContextVar('read_database', default=None)
+
+
+def read_database():
+    """Псевдоним базы, с которой читает текущий запрос."""
+    return _read_database.get() or DEFAULT_DB_ALIAS
+
+
+def set_read_database(alias):
+    """
+    Задаёт базу для чтений до конца запроса; None — основная база.
+
+    Поток WSGI-сервера обслуживает и следующие запросы, поэтому после
+    ответа выбор нужно сбросить.
+    """
+    _read_database.set(alias)
+
+
+@contextmanager
+def reading_from(alias):
+    """Направляет чтения внутри блока на базу `alias`."""
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def is_reading_from_replica():
+    return _read_database.get() not in (None, DEFAULT_DB_ALIAS)
@@ -0,0 +1,150 @@
+import re
+
+from django.db import connections, migrations
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Совпадение в заголовке весит больше, чем в тексте.
+COLUMN_WEIGHTS = {'title': 10.0, 'text': 1.0}
+
+
+def split_query(query):
+    return re.findall(r'\w+', query)
+
+
+def build_match_query(words):
+    """Каждое слово ищется как отдельная фраза по префиксу."""
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+class SearchResults:
+    """
+    Результаты полнотекстового поиска, которые понимает Paginator.
+
+    Оба запроса начинаются с индекса FTS5, а ограничения исходного
+    queryset проверяются подзапросом, который SQLite вычисляет один раз.
+    При обычном соединении таблиц планировщик может пойти от другого
+    индекса (например, по автору) и выполнять MATCH для каждой строки.
+    Сырой SQL выполняется на той же базе, что и queryset, в том числе
+    на реплике.
+    """
+
+    def __init__(self, queryset, match):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.match = match
+        self.table = fts_table(self.model)
+
+    def _allowed_ids(self):
+        return self.queryset.order_by().values('pk').query.sql_with_params()
+
+    def count(self):
+        return self.queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            (self.match,),
+        )).count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step:
+            raise TypeError('Поддерживаются только срезы без шага.')
+        offset = index.start or 0
+        limit = -1 if index.stop is None else max(index.stop - offset, 0)
+        allowed_sql, allowed_params = self._allowed_ids()
+        weights = ', '.join(map(str, COLUMN_WEIGHTS.values()))
+        # Унарный плюс не даёт FTS5 превратить IN в поиск по каждому rowid.
+        with connections[self.queryset.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s AND +rowid IN ({allowed_sql}) '
+                f'ORDER BY bm25({self.table}, {weights}) LIMIT %s OFFSET %s',
+                (self.match, *allowed_params, limit, offset),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        objects = self.queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+def search(queryset, query):
+    """
+    Записи queryset, подходящие под запрос, от лучших к худшим.
+
+    На SQLite используется индекс FTS5 из fts_migration, на остальных
+    базах — icontains по тем же столбцам.
+    """
+    words = split_query(query)
+    if not words:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        condition = Q()
+        for word in words:
+            word_condition = Q()
+            for column in COLUMN_WEIGHTS:
+                word_condition |= Q(**{f'{column}__icontains': word})
+            condition &= word_condition
+        return queryset.filter(condition)
+    return SearchResults(queryset, build_match_query(words))
+
+
+def run_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+def fts_migration(table):
+    """
+    Операция миграции с индексом FTS5 по заголовку и тексту таблицы.
+
+    Полнотекстовый индекс хранит только токены, сами тексты берутся из
+    таблицы (external content). Триггеры держат индекс в актуальном
+    состоянии. Миграции, пересоздающие таблицу в SQLite (например,
+    AlterField), удаляют и триггеры, поэтому после них их нужно создать
+    заново.
+    """
+    fts = f'{table}_fts'
+    columns = ', '.join(COLUMN_WEIGHTS)
+    new = ', '.join(f'new.{column}' for column in COLUMN_WEIGHTS)
+    old = ', '.join(f'old.{column}' for column in COLUMN_WEIGHTS)
+    create_sql = (
+        f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {columns},
+            content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {fts}_update AFTER UPDATE OF {columns}
+        ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columns})
+            VALUES ('delete', old.id, {old});
+            INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});
+        END
+        """,
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    )
+    drop_sql = (
+        f'DROP TRIGGER IF EXISTS {fts}_insert',
+        f'DROP TRIGGER IF EXISTS {fts}_delete',
+        f'DROP TRIGGER IF EXISTS {fts}_update',
+        f'DROP TABLE IF EXISTS {fts}',
+    )
+    return migrations.RunPython(run_sqlite(create_sql), run_sqlite(drop_sql))
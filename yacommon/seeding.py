@@ -0,0 +1,82 @@
+import random
+from collections import namedtuple
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+BATCH_SIZE = 5_000
+
+Seeding = namedtuple('Seeding', ('rng', 'now', 'user_pks', 'author_ids'))
+
+
+def pk_range(model, count):
+    """Ключи для `count` новых строк после уже существующих."""
+    first = (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+    return range(first, first + count)
+
+
+def bulk_create(model, objects, batch_size=BATCH_SIZE):
+    """Сохраняет объекты из итератора пачками, не держа их все в памяти."""
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def reset_sequences(*models):
+    """Сдвигает автоинкремент за явно заданные ключи."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def phrase(rng, words, length):
+    return ' '.join(rng.choice(words) for _ in range(length))
+
+
+def seed_users(count, now, batch_size=BATCH_SIZE):
+    """Создаёт пользователей seed-user-<pk> без пароля."""
+    User = get_user_model()
+    pks = pk_range(User, count)
+    bulk_create(User, (
+        User(
+            pk=pk,
+            username=f'seed-user-{pk}',
+            password=UNUSABLE_PASSWORD_PREFIX,
+            date_joined=now,
+        )
+        for pk in pks
+    ), batch_size)
+    return pks
+
+
+@contextmanager
+def seeding(models, users, seed=0, now=None, batch_size=BATCH_SIZE):
+    """
+    Общая часть наполнения базы для генераторов проектов.
+
+    Внутри одной транзакции создаёт `users` пользователей и отдаёт
+    генератор случайных чисел, текущее время и авторов: новых
+    пользователей или, если их нет, уже существующих. После блока
+    автоинкремент пользователей и `models` сдвигается за явные ключи.
+    """
+    rng = random.Random(seed)
+    now = now or timezone.now()
+    with transaction.atomic():
+        user_pks = seed_users(users, now, batch_size)
+        author_ids = list(user_pks) or list(
+            get_user_model().objects.order_by('pk').values_list(
+                'pk', flat=True
+            )
+        )
+        yield Seeding(rng, now, user_pks, author_ids)
+        reset_sequences(get_user_model(), *models)
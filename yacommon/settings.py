@@ -0,0 +1,44 @@
+"""
+Настройки профилирования, общие для обоих проектов.
+
+Проекты импортируют их в свои settings.py, а сами задают только то, что
+у них отличается: долю замеряемых запросов, включение профилирования CPU
+и профилируемые представления.
+"""
+
+# В начало MIDDLEWARE, чтобы замер охватывал остальные middleware.
+PROFILING_MIDDLEWARE = [
+    'yacommon.profiling.ProfilingMiddleware',
+    'yacommon.profiling.CpuProfilingMiddleware',
+]
+
+# Раз в сколько секунд сводка профилирования пишется в лог.
+PROFILING_LOG_INTERVAL = 60
+
+# Сколько раз одинаковый SQL повторяется за запрос, чтобы считаться N+1.
+PROFILING_DUPLICATE_THRESHOLD = 3
+
+# Заголовок, с которым профилируется любой запрос сотрудника (is_staff).
+CPU_PROFILING_HEADER = 'X-Cpu-Profile'
+
+# Период выборки стеков в секундах процессорного времени.
+CPU_PROFILING_INTERVAL = 0.005
+
+# Через сколько секунд без профилируемых запросов останавливается таймер.
+CPU_PROFILING_IDLE_SECONDS = 1
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yacommon.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
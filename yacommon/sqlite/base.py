@@ -0,0 +1,43 @@
+from django.db.backends.sqlite3 import base
+
+# Значения по умолчанию; переопределяются через OPTIONS['pragmas'].
+PRAGMAS = {
+    # Читатели не ждут писателя, а писатель — читателей.
+    'journal_mode': 'wal',
+    # В режиме WAL fsync при каждом коммите не нужен для целостности.
+    'synchronous': 'normal',
+    # Сколько миллисекунд ждать освобождения блокировки вместо ошибки.
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение задаёт размер кеша страниц в КиБ.
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite, настроенный для одновременной работы нескольких потоков.
+
+    Прагмы применяются к каждому новому соединению, поэтому вместе с
+    CONN_MAX_AGE они выполняются один раз на соединение, а не на запрос.
+    Транзакции открываются как BEGIN IMMEDIATE: блокировка на запись
+    берётся сразу, и конкурирующий писатель ждёт busy_timeout. При
+    обычном BEGIN SQLite не может дождаться повышения блокировки внутри
+    транзакции и сразу отвечает «database is locked».
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE')
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}'.strip())
@@ -0,0 +1,181 @@
+import logging
+import signal
+import time
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory
+from django.urls import ResolverMatch
+
+from yacommon import profiling
+
+VIEW_NAME = 'page'
+URL = '/page/'
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def profiled(settings):
+    settings.PROFILING_SAMPLE_RATE = 1
+    profiling.reset()
+    yield
+    profiling.reset()
+
+
+@pytest.fixture
+def cpu_profiling(settings):
+    settings.CPU_PROFILING = True
+    settings.CPU_PROFILING_VIEWS = (VIEW_NAME,)
+    if not profiling.install_cpu_sampler():
+        pytest.skip('SIGPROF недоступен или тесты идут не в главном потоке.')
+
+
+@pytest.fixture
+def staff():
+    return get_user_model().objects.create(username='staff', is_staff=True)
+
+
+def burn_cpu(request):
+    deadline = time.process_time() + 1
+    while not profiling._cpu_stacks and time.process_time() < deadline:
+        pass
+    return HttpResponse()
+
+
+def page_request(user=None, view_name=VIEW_NAME, **extra):
+    request = RequestFactory().get(URL, **extra)
+    request.resolver_match = ResolverMatch(burn_cpu, (), {}, view_name)
+    request.user = user or AnonymousUser()
+    return request
+
+
+def test_request_is_profiled():
+    original_render = Template.render
+
+    def view(request):
+        assert Template.render is not original_render
+        get_user_model().objects.exists()
+        return HttpResponse(Template('{{ value }}').render(Context({
+            'value': 'Текст',
+        })))
+
+    profiling.ProfilingMiddleware(view)(page_request())
+    report = profiling.get_report()[VIEW_NAME]
+    assert report['requests'] == 1
+    assert report['sql_count'] == 1
+    assert report['template_ms'] > 0
+    assert report['n_plus_one_requests'] == 0
+    # Вне замера шаблоны рендерятся без обёртки.
+    assert Template.render is original_render
+
+
+def test_zero_sample_rate_disables_middleware(settings):
+    settings.PROFILING_SAMPLE_RATE = 0
+    with pytest.raises(MiddlewareNotUsed):
+        profiling.ProfilingMiddleware(HttpResponse)
+
+
+def test_repeated_queries_are_n_plus_one_suspects():
+    def view(request):
+        for _ in range(3):
+            get_user_model().objects.filter(pk=1).exists()
+        return HttpResponse()
+
+    profiling.ProfilingMiddleware(view)(page_request())
+    report = profiling.get_report()[VIEW_NAME]
+    assert report['sql_count'] == 3
+    assert report['n_plus_one_requests'] == 1
+    assert report['n_plus_one_suspects'][0]['repeats'] == 3
+
+
+def test_report_is_logged_periodically(settings, caplog):
+    settings.PROFILING_LOG_INTERVAL = 0
+    with caplog.at_level(logging.INFO, logger='yacommon.profiling'):
+        profiling.ProfilingMiddleware(HttpResponse)(page_request())
+    assert any(
+        record.getMessage().startswith(VIEW_NAME)
+        for record in caplog.records
+    )
+
+
+@pytest.mark.parametrize(
+    'view', (profiling.ProfilingReport, profiling.CpuProfileExport)
+)
+def test_reports_are_staff_only(staff, view):
+    with pytest.raises(Http404):
+        view.as_view()(page_request())
+    assert view.as_view()(page_request(staff)).status_code == HTTPStatus.OK
+
+
+def test_cpu_profiling_disabled_by_default(settings):
+    settings.CPU_PROFILING = False
+    with pytest.raises(MiddlewareNotUsed):
+        profiling.CpuProfilingMiddleware(HttpResponse)
+
+
+def test_cpu_stacks_of_profiled_view_are_exported(cpu_profiling):
+    middleware = profiling.CpuProfilingMiddleware(burn_cpu)
+    request = page_request()
+    middleware.process_view(request, burn_cpu, (), {})
+    middleware.process_response(request, burn_cpu(request))
+    lines = profiling.export_collapsed().splitlines()
+    assert lines
+    assert all(line.startswith(VIEW_NAME + ';') for line in lines)
+    assert any('burn_cpu' in line for line in lines)
+    speedscope = profiling.export_speedscope()
+    assert [profile['name'] for profile in speedscope['profiles']] == [
+        VIEW_NAME
+    ]
+    assert 'burn_cpu' in {
+        frame['name'] for frame in speedscope['shared']['frames']
+    }
+
+
+def test_cpu_timer_stops_when_idle(settings, cpu_profiling):
+    settings.CPU_PROFILING_IDLE_SECONDS = 60
+    middleware = profiling.CpuProfilingMiddleware(burn_cpu)
+    request = page_request()
+    middleware.process_view(request, burn_cpu, (), {})
+    middleware.process_response(request, HttpResponse())
+    assert signal.getitimer(signal.ITIMER_PROF) != (0.0, 0.0)
+    settings.CPU_PROFILING_IDLE_SECONDS = 0
+    deadline = time.process_time() + 1
+    while (signal.getitimer(signal.ITIMER_PROF) != (0.0, 0.0)
+           and time.process_time() < deadline):
+        pass
+    assert signal.getitimer(signal.ITIMER_PROF) == (0.0, 0.0)
+
+
+def test_cpu_profiling_header_works_only_for_staff(cpu_profiling, staff):
+    middleware = profiling.CpuProfilingMiddleware(burn_cpu)
+    header = {'HTTP_X_CPU_PROFILE': '1'}
+    other = 'other'
+    assert not middleware.is_profiled(page_request(view_name=other))
+    assert not middleware.is_profiled(
+        page_request(view_name=other, **header)
+    )
+    assert middleware.is_profiled(
+        page_request(staff, view_name=other, **header)
+    )
+
+
+@pytest.mark.parametrize(
+    'export_format, status',
+    (
+        ('collapsed', HTTPStatus.OK),
+        ('speedscope', HTTPStatus.OK),
+        ('svg', HTTPStatus.BAD_REQUEST),
+    )
+)
+def test_cpu_profile_export_formats(staff, export_format, status):
+    request = page_request(staff, QUERY_STRING=f'format={export_format}')
+    response = profiling.CpuProfileExport.as_view()(request)
+    assert response.status_code == status
+    if status == HTTPStatus.OK:
+        assert 'attachment' in response['Content-Disposition']
@@ -0,0 +1,15 @@
+from django.http import Http404
+
+
+class StaffOnlyMixin:
+    """
+    Служебная страница: отдаёт 404 всем, кроме сотрудников (is_staff).
+
+    Проверяется пользователь, а не адрес клиента: за обратным прокси у
+    всех запросов один и тот же адрес.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            raise Http404
+        return super().dispatch(request, *args, **kwargs)